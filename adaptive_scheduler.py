@@ -0,0 +1,134 @@
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def parse_db_timestamp(value):
+    """Convert a SQLite CURRENT_TIMESTAMP string (UTC) to epoch seconds"""
+    if not value:
+        return None
+    return datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+
+def refresh_interval(signal, now=None):
+    """Seconds until a product should be scraped again
+    
+    Volatile products and products with active alerts are refreshed more
+    often; products whose price has not moved in a while less often.
+    """
+    now = time.time() if now is None else now
+    interval = Config.REFRESH_BASE_INTERVAL
+    
+    samples = signal['samples']
+    if samples > 1:
+        mean = signal['price_sum'] / samples
+        # Sample stdev, same as statistics.stdev in PriceAnalyzer.get_price_trend
+        variance = (signal['price_sum_squares'] - signal['price_sum'] ** 2 / samples) / (samples - 1)
+        stdev = math.sqrt(max(variance, 0))
+        if mean > 0:
+            interval /= 1 + (stdev / mean) * Config.REFRESH_VOLATILITY_WEIGHT
+    
+    interval /= 1 + signal['active_alerts'] * Config.REFRESH_ALERT_WEIGHT
+    
+    # Unchanged pages write no new samples, so stability is measured in time
+    # since the price last moved, or since the product was first seen
+    stable_since = parse_db_timestamp(signal['last_changed']) or parse_db_timestamp(signal['first_seen'])
+    if signal['last_checked'] and stable_since:
+        stable_days = max(now - stable_since, 0) / 86400
+        interval *= 1 + min(stable_days / Config.REFRESH_STALE_DAYS, 1)
+    
+    return min(max(interval, Config.REFRESH_MIN_INTERVAL), Config.REFRESH_MAX_INTERVAL)
+
+class AdaptiveRefreshQueue:
+    """Priority queue of tracked products ordered by when they are next due
+    
+    Products ingested from the same search page are refreshed by one fetch
+    of that page, so when one of them falls due the rest of its page comes
+    along with it.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._heap = []  # (due, product_id)
+        self._due = {}
+        self._products = {}
+        self._pages = defaultdict(set)  # (platform, search_query) -> product ids
+        self._lock = threading.Lock()
+    
+    def _schedule(self, signal, now, not_before=None):
+        last_checked = parse_db_timestamp(signal['last_checked'])
+        # Never-scraped products are due immediately
+        due = last_checked + refresh_interval(signal, now) if last_checked else now
+        if not_before is not None:
+            due = max(due, not_before)
+        
+        product_id = signal['product_id']
+        self._due[product_id] = due
+        self._products[product_id] = (
+            product_id, signal['name'], signal['platform'], signal['url'], signal['search_query']
+        )
+        if signal['search_query']:
+            self._pages[(signal['platform'], signal['search_query'])].add(product_id)
+        heapq.heappush(self._heap, (due, product_id))
+    
+    def reload(self):
+        """Rebuild the queue from the database, picking up new products and alerts"""
+        now = time.time()
+        signals = self.db.get_refresh_signals()
+        
+        with self._lock:
+            self._heap = []
+            self._due = {}
+            self._products = {}
+            self._pages = defaultdict(set)
+            for signal in signals:
+                self._schedule(signal, now)
+        
+        logger.info(f"Adaptive refresh queue loaded {len(signals)} products")
+    
+    def reschedule(self, product_ids):
+        """Recompute due times for products that were just refreshed"""
+        now = time.time()
+        signals = self.db.get_refresh_signals(product_ids=product_ids)
+        
+        # A failed scrape leaves last_checked unchanged; back off instead of retrying every tick
+        with self._lock:
+            for signal in signals:
+                self._schedule(signal, now, not_before=now + Config.REFRESH_MIN_INTERVAL)
+    
+    def pop_due(self, limit=None, now=None):
+        """Remove and return up to ``limit`` overdue products, most overdue first
+        
+        Products from the same search page are returned together, which can
+        take the result past ``limit``; they cost one request between them.
+        """
+        now = time.time() if now is None else now
+        limit = Config.REFRESH_MAX_PER_TICK if limit is None else limit
+        due_products = []
+        
+        with self._lock:
+            while self._heap and len(due_products) < limit and self._heap[0][0] <= now:
+                due, product_id = heapq.heappop(self._heap)
+                # Skip entries superseded by a later reschedule
+                if self._due.get(product_id) != due:
+                    continue
+                del self._due[product_id]
+                due_products.append(self._products[product_id])
+                
+                # The page fetch refreshes its other listings too, however far off they were
+                _, _, platform, _, search_query = self._products[product_id]
+                if search_query:
+                    for other_id in self._pages[(platform, search_query)]:
+                        if self._due.pop(other_id, None) is not None:
+                            due_products.append(self._products[other_id])
+        
+        return due_products
+    
+    def __len__(self):
+        return len(self._due)
@@ -1,217 +1,262 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-from datetime import datetime
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed, wait
 from config import Config
+from http_pool import session_pool
+from platforms import get_platform, platform_names
+from rate_limiter import rate_limiter
+from conditional_fetch import ConditionalFetcher
+from circuit_breaker import CircuitOpenError, breakers
+from browser_pool import browser_rendering_enabled, get_browser_pool
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+def first_per_platform(results):
+    """Keep the top listing of each platform, in order"""
+    seen = set()
+    top = []
+    for result in results:
+        if result['platform'] not in seen:
+            seen.add(result['platform'])
+            top.append(result)
+    return top
+
 class AdvancedScraper:
     """Enhanced web scraper supporting multiple platforms"""
     
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
+        self.headers = dict(DEFAULT_HEADERS)
         self.timeout = Config.SCRAPE_TIMEOUT
-        self.max_retries = Config.MAX_RETRIES
+        self.http = session_pool
+        self.rate_limiter = rate_limiter
+        self.breakers = breakers
+        self.fetcher = ConditionalFetcher(self.http)
+        self.browser_fetcher = None  # created when a JS-rendered platform is first fetched
+        self.deadline = Config.SEARCH_DEADLINE
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.SCRAPE_MAX_WORKERS,
+            thread_name_prefix='scraper'
+        )
     
-    def search_all_platforms(self, product_name):
-        """Search product across all supported platforms"""
+    def get_platform_scrapers(self, platforms=None, all_results=False):
+        """Map registered platform names to scraper callables, optionally filtered"""
+        scrape = self.scrape_platform_all if all_results else self.scrape_platform
+        return {
+            name: partial(scrape, name)
+            for name in platform_names()
+            if not platforms or name in platforms
+        }
+    
+    def search_all_platforms(self, product_name, platforms=None, concurrent=True, deadline=None,
+                             all_results=False):
+        """Search product across all supported platforms
+        
+        In concurrent mode every platform is scraped at once on the shared
+        worker pool and whatever finishes within ``deadline`` seconds is
+        returned, so latency is bounded by the slowest platform instead of
+        the sum of all of them. With ``all_results`` every listing on each
+        search page is returned instead of only the first.
+        """
+        if not concurrent:
+            return self._search_sequential(product_name, platforms, all_results)
+        
+        deadline = self.deadline if deadline is None else deadline
+        
+        futures = {}
+        for platform_name, scraper_func in self.get_platform_scrapers(platforms, all_results).items():
+            logger.info(f"Scraping {platform_name}...")
+            futures[platform_name] = self.executor.submit(scraper_func, product_name)
+        
+        done, _ = wait(futures.values(), timeout=deadline)
+        
         results = []
+        for platform_name, future in futures.items():
+            if future not in done:
+                future.cancel()
+                logger.warning(f"{platform_name} missed the {deadline}s search deadline")
+                continue
+            try:
+                self._collect(results, future.result())
+            except Exception as e:
+                logger.error(f"Error scraping {platform_name}: {e}")
+        
+        return results
+    
+    def iter_search(self, product_name, platforms=None, deadline=None, all_results=False):
+        """Yield ``(platform, results)`` for each platform as soon as it finishes
+        
+        ``results`` is a list (empty when the platform found nothing).
+        Platforms still running at the deadline are cancelled and skipped.
+        """
+        deadline = self.deadline if deadline is None else deadline
         
-        platforms = {
-            'Amazon': self.scrape_amazon,
-            'Flipkart': self.scrape_flipkart,
-            'Myntra': self.scrape_myntra,
-            'Snapdeal': self.scrape_snapdeal
+        futures = {
+            self.executor.submit(scraper_func, product_name): platform_name
+            for platform_name, scraper_func in self.get_platform_scrapers(platforms, all_results).items()
         }
         
-        for platform_name, scraper_func in platforms.items():
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                results = []
+                try:
+                    self._collect(results, future.result())
+                except Exception as e:
+                    logger.error(f"Error scraping {futures[future]}: {e}")
+                yield futures[future], results
+        except TimeoutError:
+            for future, platform_name in futures.items():
+                if not future.done():
+                    future.cancel()
+                    logger.warning(f"{platform_name} missed the {deadline}s search deadline")
+    
+    @staticmethod
+    def _collect(results, result):
+        if isinstance(result, list):
+            results.extend(result)
+        elif result:
+            results.append(result)
+    
+    def _search_sequential(self, product_name, platforms=None, all_results=False):
+        """Search platforms one after another"""
+        results = []
+        
+        for platform_name, scraper_func in self.get_platform_scrapers(platforms, all_results).items():
             try:
                 logger.info(f"Scraping {platform_name}...")
-                result = scraper_func(product_name)
-                if result:
-                    results.append(result)
-                time.sleep(1)  # Rate limiting
+                self._collect(results, scraper_func(product_name))
             except Exception as e:
                 logger.error(f"Error scraping {platform_name}: {e}")
         
         return results
     
-    def scrape_amazon(self, product_name):
-        """Enhanced Amazon scraper"""
-        try:
-            search_url = f"https://www.amazon.in/s?k={product_name.replace(' ', '+')}"
-            
-            for attempt in range(self.max_retries):
-                try:
-                    response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
-                    response.raise_for_status()
-                    break
-                except requests.RequestException as e:
-                    if attempt == self.max_retries - 1:
-                        raise
-                    time.sleep(2)
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Multiple selectors for better accuracy
-            product = soup.find('div', {'data-component-type': 's-search-result'})
-            
-            if product:
-                # Extract title
-                title_elem = product.find('h2', {'class': 'a-size-mini'}) or product.find('span', {'class': 'a-text-normal'})
-                
-                # Extract price
-                price_elem = product.find('span', {'class': 'a-price-whole'})
-                
-                # Extract link
-                link_elem = product.find('a', {'class': 'a-link-normal'})
-                
-                # Extract rating
-                rating_elem = product.find('span', {'class': 'a-icon-alt'})
-                
-                # Extract image
-                image_elem = product.find('img', {'class': 's-image'})
-                
-                if title_elem and price_elem:
-                    price_text = price_elem.text.replace(',', '').replace('₹', '').strip()
-                    
-                    return {
-                        'platform': 'Amazon',
-                        'product_name': title_elem.text.strip()[:200],
-                        'price': float(price_text),
-                        'currency': 'INR',
-                        'url': f"https://www.amazon.in{link_elem['href']}" if link_elem else search_url,
-                        'rating': rating_elem.text.split()[0] if rating_elem else 'N/A',
-                        'image': image_elem['src'] if image_elem else '',
-                        'timestamp': datetime.now().isoformat()
-                    }
+    def fetcher_for(self, spec):
+        """Browser-backed fetcher for JS-rendered platforms when rendering is enabled"""
+        if spec is not None and spec.js_rendered and browser_rendering_enabled():
+            if self.browser_fetcher is None:
+                self.browser_fetcher = ConditionalFetcher(get_browser_pool())
+            return self.browser_fetcher
+        return self.fetcher
+    
+    def fetch(self, platform, url, variant=None):
+        """Conditionally GET a page through the pooled session
         
-        except Exception as e:
-            logger.error(f"Amazon scraping error: {e}")
+        Callers acquire the platform's rate limit first.
+        """
+        spec = get_platform(platform)
+        marker = spec.fragment_marker if spec else None
         
-        return None
+        # Every-card results can change anywhere in the result region
+        whole_region = variant == 'all'
+        
+        fetcher = self.fetcher_for(spec)
+        if fetcher is self.browser_fetcher:
+            # Wait until the scripts have rendered at least one result card
+            return fetcher.fetch(url, self.headers, Config.BROWSER_PAGE_TIMEOUT, marker, variant,
+                                 whole_region, wait_for=spec.wait_selector)
+        return fetcher.fetch(url, self.headers, self.timeout, marker, variant, whole_region)
     
-    def scrape_flipkart(self, product_name):
-        """Enhanced Flipkart scraper"""
-        try:
-            search_url = f"https://www.flipkart.com/search?q={product_name.replace(' ', '%20')}"
-            
-            response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try multiple selectors
-            product = (soup.find('div', {'class': '_1AtVbE'}) or 
-                      soup.find('div', {'class': '_2kHMtA'}) or
-                      soup.find('div', {'class': '_13oc-S'}))
-            
-            if product:
-                title_elem = (product.find('div', {'class': '_4rR01T'}) or 
-                            product.find('a', {'class': 's1Q9rs'}))
-                
-                price_elem = (product.find('div', {'class': '_30jeq3'}) or
-                            product.find('div', {'class': '_25b18c'}))
-                
-                link_elem = product.find('a', {'class': '_1fQZEK'}) or product.find('a')
-                
-                rating_elem = product.find('div', {'class': '_3LWZlK'})
-                
-                if title_elem and price_elem:
-                    price_text = price_elem.text.replace(',', '').replace('₹', '').strip()
-                    
-                    return {
-                        'platform': 'Flipkart',
-                        'product_name': title_elem.text.strip()[:200],
-                        'price': float(price_text),
-                        'currency': 'INR',
-                        'url': f"https://www.flipkart.com{link_elem['href']}" if link_elem else search_url,
-                        'rating': rating_elem.text if rating_elem else 'N/A',
-                        'image': '',
-                        'timestamp': datetime.now().isoformat()
-                    }
+    def guarded(self, platform, func, *args):
+        """Call ``func`` through the platform's circuit breaker and rate limit
+        
+        An open circuit raises CircuitOpenError before waiting on the rate
+        limit, so dead platforms cost nothing, and again after the wait if
+        the circuit opened meanwhile. The wait itself is not counted as
+        platform latency.
+        """
+        breaker = self.breakers.get(platform)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{platform} circuit is open")
+        self.rate_limiter.acquire(platform)
+        # The circuit may have opened while this call waited for a token
+        if breaker.is_open():
+            raise CircuitOpenError(f"{platform} circuit opened while waiting on the rate limit")
+        return breaker.measure(func, *args)
+    
+    def scrape_platform(self, platform, product_name):
+        """Scrape the first search result from any registered platform"""
+        spec = get_platform(platform)
+        if spec is None:
+            logger.error(f"Unknown platform: {platform}")
+            return None
         
+        try:
+            return self.guarded(platform, self._scrape_first, spec, product_name)
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {platform}: {e}")
         except Exception as e:
-            logger.error(f"Flipkart scraping error: {e}")
+            logger.error(f"{platform} scraping error: {e}")
         
         return None
     
-    def scrape_myntra(self, product_name):
-        """Myntra scraper for fashion products"""
-        try:
-            search_url = f"https://www.myntra.com/{product_name.replace(' ', '-')}"
-            
-            response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Myntra uses dynamic loading, this is a basic implementation
-            product = soup.find('li', {'class': 'product-base'})
-            
-            if product:
-                title_elem = product.find('h4', {'class': 'product-product'})
-                price_elem = product.find('span', {'class': 'product-discountedPrice'})
-                link_elem = product.find('a')
-                
-                if title_elem and price_elem:
-                    price_text = price_elem.text.replace(',', '').replace('Rs.', '').strip()
-                    
-                    return {
-                        'platform': 'Myntra',
-                        'product_name': title_elem.text.strip()[:200],
-                        'price': float(price_text),
-                        'currency': 'INR',
-                        'url': f"https://www.myntra.com{link_elem['href']}" if link_elem else search_url,
-                        'rating': 'N/A',
-                        'image': '',
-                        'timestamp': datetime.now().isoformat()
-                    }
+    def _scrape_first(self, spec, product_name):
+        search_url = spec.build_url(product_name)
         
-        except Exception as e:
-            logger.error(f"Myntra scraping error: {e}")
+        # Retries with backoff are handled by the pooled session adapter
+        page = self.fetch(spec.name, search_url)
+        if page.unchanged:
+            return page.result
+        response = page.response
+        response.raise_for_status()
         
-        return None
+        soup = spec.parse(response.content)
+        return self.fetcher_for(spec).remember(search_url, spec.extract(soup, search_url))
     
-    def scrape_snapdeal(self, product_name):
-        """Snapdeal scraper"""
-        try:
-            search_url = f"https://www.snapdeal.com/search?keyword={product_name.replace(' ', '%20')}"
-            
-            response = requests.get(search_url, headers=self.headers, timeout=self.timeout)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            product = soup.find('div', {'class': 'product-tuple-listing'})
-            
-            if product:
-                title_elem = product.find('p', {'class': 'product-title'})
-                price_elem = product.find('span', {'class': 'lfloat product-price'})
-                link_elem = product.find('a', {'class': 'dp-widget-link'})
-                
-                if title_elem and price_elem:
-                    price_text = price_elem.text.replace(',', '').replace('Rs.', '').strip()
-                    
-                    return {
-                        'platform': 'Snapdeal',
-                        'product_name': title_elem.text.strip()[:200],
-                        'price': float(price_text),
-                        'currency': 'INR',
-                        'url': link_elem['href'] if link_elem else search_url,
-                        'rating': 'N/A',
-                        'image': '',
-                        'timestamp': datetime.now().isoformat()
-                    }
+    def _iter_results(self, spec, product_name):
+        search_url = spec.build_url(product_name)
+        page = self.fetch(spec.name, search_url, variant='all')
+        if page.unchanged:
+            yield from page.result
+            return
+        page.response.raise_for_status()
         
+        soup = spec.parse(page.response.content)
+        results = []
+        for result in spec.extract_all(soup, search_url):
+            results.append(result)
+            yield result
+        self.fetcher_for(spec).remember(search_url, results, variant='all')
+    
+    def scrape_platform_all(self, platform, product_name):
+        """Scrape every listing from one platform's search page"""
+        spec = get_platform(platform)
+        if spec is None:
+            logger.error(f"Unknown platform: {platform}")
+            return []
+        
+        try:
+            return self.guarded(platform, lambda: list(self._iter_results(spec, product_name)))
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {platform}: {e}")
         except Exception as e:
-            logger.error(f"Snapdeal scraping error: {e}")
+            logger.error(f"{platform} scraping error: {e}")
         
-        return None
+        return []
+    
+    def scrape_amazon(self, product_name):
+        """Enhanced Amazon scraper"""
+        return self.scrape_platform('Amazon', product_name)
+    
+    def scrape_flipkart(self, product_name):
+        """Enhanced Flipkart scraper"""
+        return self.scrape_platform('Flipkart', product_name)
+    
+    def scrape_myntra(self, product_name):
+        """Myntra scraper for fashion products"""
+        return self.scrape_platform('Myntra', product_name)
+    
+    def scrape_snapdeal(self, product_name):
+        """Snapdeal scraper"""
+        return self.scrape_platform('Snapdeal', product_name)
 
 # Test scraper
 if __name__ == '__main__':
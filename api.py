@@ -3,7 +3,10 @@ from functools import wraps
 import time
 from collections import defaultdict
 from database import Database
-from advanced_scraper import AdvancedScraper
+from price_analyzer import PriceAnalyzer, RECOMMENDATION_DAYS
+from async_scraper import create_scraper
+from search_cache import search_cache
+from conditional_fetch import strip_unchanged
 
 # Create API blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
@@ -38,7 +41,8 @@ def rate_limit(f):
     return decorated_function
 
 db = Database()
-scraper = AdvancedScraper()
+scraper = create_scraper()
+analyzer = PriceAnalyzer(db)
 
 @api_bp.route('/search', methods=['GET'])
 @rate_limit
@@ -48,20 +52,23 @@ def api_search():
     Query params: q (product name), platforms (comma-separated)
     """
     product_name = request.args.get('q', '')
-    platforms = request.args.get('platforms', '').split(',')
+    platforms = [p.strip() for p in request.args.get('platforms', '').split(',') if p.strip()]
     
     if not product_name:
         return jsonify({'error': 'Product name required'}), 400
     
-    results = scraper.search_all_platforms(product_name)
-    
-    # Filter by platforms if specified
-    if platforms and platforms[0]:
-        results = [r for r in results if r['platform'] in platforms]
+    # Only scrape the requested platforms; repeat queries are served from cache
+    results, cached = search_cache.get_or_load(
+        product_name,
+        platforms,
+        lambda: [strip_unchanged(result)
+                 for result in scraper.search_all_platforms(product_name, platforms=platforms)]
+    )
     
     return jsonify({
         'success': True,
         'count': len(results),
+        'cached': cached,
         'results': results
     })
 
@@ -132,14 +139,15 @@ def api_compare():
     if not product_ids:
         return jsonify({'error': 'Product IDs required'}), 400
     
+    latest = db.get_latest_prices(product_ids)
+    
     comparison = []
     for product_id in product_ids:
-        history = db.get_price_history(product_id, days=1)
-        if history:
+        if product_id in latest:
             comparison.append({
                 'product_id': product_id,
-                'current_price': history[0]['price'],
-                'timestamp': history[0]['timestamp']
+                'current_price': latest[product_id]['price'],
+                'timestamp': latest[product_id]['timestamp']
             })
     
     return jsonify({
@@ -147,6 +155,27 @@ def api_compare():
         'comparison': comparison
     })
 
+@api_bp.route('/analytics', methods=['POST'])
+@rate_limit
+def api_analytics():
+    """
+    Trend, volatility, price position and savings for many products
+    Body: {product_ids: [1, 2, 3], days: 30}
+    """
+    data = request.get_json()
+    product_ids = data.get('product_ids', [])
+    days = int(data.get('days', 30))
+    
+    if not product_ids:
+        return jsonify({'error': 'Product IDs required'}), 400
+    
+    return jsonify({
+        'success': True,
+        'days': days,
+        'recommendation_days': RECOMMENDATION_DAYS,
+        'products': analyzer.summarize_products(product_ids, days)
+    })
+
 @api_bp.route('/stats', methods=['GET'])
 @rate_limit
 def api_stats():
@@ -1,10 +1,15 @@
-from flask import Flask, render_template, request, jsonify
-from advanced_scraper import AdvancedScraper
+from flask import Flask, Response, render_template, request, jsonify
+from advanced_scraper import first_per_platform
+from async_scraper import create_scraper
+from conditional_fetch import strip_unchanged
 from database import Database
 from price_analyzer import PriceAnalyzer
 from email_alerts import EmailAlerts
+from search_cache import search_cache
+from circuit_breaker import breakers
 from api import api_bp
 from config import Config
+import threading
 import json
 
 app = Flask(__name__)
@@ -15,15 +20,41 @@ app.register_blueprint(api_bp)
 
 # Initialize components
 db = Database()
-scraper = AdvancedScraper()
-analyzer = PriceAnalyzer()
+scraper = create_scraper()
+analyzer = PriceAnalyzer(db)
 email_alerts = EmailAlerts()
 
+def send_triggered_alerts():
+    """Email triggered alerts without holding up the request"""
+    threading.Thread(target=email_alerts.notify_pending_alerts, args=(db,), daemon=True).start()
+
+db.on_alerts_triggered = send_triggered_alerts
+
 @app.route('/')
 def index():
     """Render main page"""
     return render_template('index.html')
 
+def build_analysis(results):
+    """Best deal and potential savings across one result per platform"""
+    best_deal = min(results, key=lambda x: x['price'])
+    worst_deal = max(results, key=lambda x: x['price'])
+    savings = worst_deal['price'] - best_deal['price']
+    
+    return {
+        'best_platform': best_deal['platform'],
+        'best_price': best_deal['price'],
+        'potential_savings': round(savings, 2),
+        'total_platforms': len(results)
+    }
+
+def save_listings(listings, product_name):
+    """Save scraped listings; a whole ingested page remembers its query for refreshes"""
+    if Config.SEARCH_INGEST_ALL_RESULTS:
+        search_query, _ = search_cache.make_key(product_name)
+        listings = [dict(listing, search_query=search_query) for listing in listings]
+    db.save_prices_bulk(listings)
+
 @app.route('/search', methods=['POST'])
 def search():
     """Search for product prices across platforms"""
@@ -34,28 +65,24 @@ def search():
         if not product_name:
             return jsonify({'error': 'Product name is required'}), 400
         
-        # Scrape prices from all platforms
-        results = scraper.search_all_platforms(product_name)
+        def scrape_and_save():
+            # Scrape prices from all platforms, keeping every listing on each page
+            listings = scraper.search_all_platforms(
+                product_name, all_results=Config.SEARCH_INGEST_ALL_RESULTS
+            )
+            
+            # Save to database in one transaction
+            save_listings(listings, product_name)
+            return [strip_unchanged(result) for result in first_per_platform(listings)]
         
-        # Save to database
-        for result in results:
-            db.save_price(result)
+        # Identical queries within the TTL share one scrape
+        results, _ = search_cache.get_or_load(product_name, None, scrape_and_save)
         
-        # Add analysis
         if results:
-            best_deal = min(results, key=lambda x: x['price'])
-            worst_deal = max(results, key=lambda x: x['price'])
-            savings = worst_deal['price'] - best_deal['price']
-            
             return jsonify({
                 'success': True,
                 'results': results,
-                'analysis': {
-                    'best_platform': best_deal['platform'],
-                    'best_price': best_deal['price'],
-                    'potential_savings': round(savings, 2),
-                    'total_platforms': len(results)
-                }
+                'analysis': build_analysis(results)
             })
         else:
             return jsonify({
@@ -66,18 +93,81 @@ def search():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/search/stream', methods=['POST'])
+def search_stream():
+    """Search like /search, streaming NDJSON events as each platform finishes
+    
+    Emits one ``result`` event per platform with its top listing, then an
+    ``analysis`` event (or ``empty`` when nothing was found).
+    """
+    data = request.get_json()
+    product_name = data.get('product_name', '')
+    
+    if not product_name:
+        return jsonify({'error': 'Product name is required'}), 400
+    
+    def event(payload):
+        return json.dumps(payload) + '\n'
+    
+    def scrape_and_save():
+        listings = []
+        results = []
+        try:
+            for platform, platform_results in scraper.iter_search(
+                product_name, all_results=Config.SEARCH_INGEST_ALL_RESULTS
+            ):
+                listings.extend(platform_results)
+                top = strip_unchanged(platform_results[0]) if platform_results else None
+                if top:
+                    results.append(top)
+                yield platform, top
+        finally:
+            # Keep what was scraped even if the client went away mid-stream
+            if listings:
+                save_listings(listings, product_name)
+        return results
+    
+    def generate():
+        # Identical concurrent searches share one scrape; only a finished one is cached
+        stream = search_cache.stream_or_load(product_name, None, scrape_and_save)
+        try:
+            while True:
+                try:
+                    platform, top = next(stream)
+                except StopIteration as done:
+                    results, cached = done.value
+                    break
+                yield event({'type': 'result', 'platform': platform, 'result': top})
+        finally:
+            stream.close()
+        
+        if cached:
+            for result in results:
+                yield event({'type': 'result', 'platform': result['platform'], 'result': result})
+        
+        if results:
+            yield event({'type': 'analysis', 'analysis': build_analysis(results)})
+        else:
+            yield event({'type': 'empty', 'message': 'No results found. Try a different search term.'})
+    
+    return Response(generate(), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # let proxies pass events through immediately
+    })
+
 @app.route('/history/<int:product_id>')
 def get_history(product_id):
     """Get price history for a product"""
     try:
         days = request.args.get('days', 30, type=int)
-        history = db.get_price_history(product_id, days)
+        analysis = analyzer.analyze(product_id, days)
+        history = analysis.history(days)
         
         # Get trend analysis
-        trend = analyzer.get_price_trend(product_id, days)
+        trend = analysis.trend(days)
         
         # Get buying recommendation
-        recommendation = analyzer.predict_best_time_to_buy(product_id)
+        recommendation = analysis.recommendation()
         
         return jsonify({
             'success': True,
@@ -114,17 +204,20 @@ def set_alert():
 def analyze_product(product_id):
     """Get detailed analysis for a product"""
     try:
+        # Trend, recommendation and savings share one aggregate load; the chart reads raw history once
+        analysis = analyzer.analyze(product_id)
+        
         # Get trend analysis
-        trend = analyzer.get_price_trend(product_id)
+        trend = analysis.trend()
         
         # Get buying recommendation
-        recommendation = analyzer.predict_best_time_to_buy(product_id)
+        recommendation = analysis.recommendation()
         
         # Calculate savings
-        savings = analyzer.calculate_savings(product_id)
+        savings = analysis.savings()
         
         # Generate chart
-        chart_html = analyzer.generate_price_chart(product_id)
+        chart_html = analysis.chart()
         
         return jsonify({
             'success': True,
@@ -169,8 +262,13 @@ def get_trending():
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
+    platforms = breakers.snapshot()
+    open_circuits = [name for name, breaker in platforms.items() if breaker['state'] != 'closed']
+    
     return jsonify({
-        'status': 'healthy',
+        'status': 'degraded' if open_circuits else 'healthy',
+        'open_circuits': open_circuits,
+        'platforms': platforms,
         'version': '2.0',
         'features': [
             'multi-platform-search',
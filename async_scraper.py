@@ -0,0 +1,298 @@
+import asyncio
+import queue
+import threading
+import time
+from functools import partial
+import requests
+from config import Config
+from advanced_scraper import AdvancedScraper, DEFAULT_HEADERS
+from browser_pool import browser_rendering_enabled, get_browser_pool
+from circuit_breaker import CircuitOpenError, breakers
+from conditional_fetch import ConditionalFetcher
+from http_pool import RETRY_STATUSES
+from platforms import get_platform, platform_names
+from rate_limiter import rate_limiter
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+class AsyncResponse:
+    """Just enough of requests.Response for a body read by aiohttp"""
+    
+    def __init__(self, url, status_code, content, headers):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+class AsyncScraper:
+    """asyncio scraping engine returning the same result dicts as AdvancedScraper
+    
+    One aiohttp session keeps up to ``max_in_flight`` requests open, at most
+    ``per_host`` of them to any one platform host. Platform rate limits and
+    conditional fetches are shared with the threaded scraper; parsing runs
+    in worker threads so the event loop never blocks on BeautifulSoup.
+    """
+    
+    def __init__(self, max_in_flight=None, per_host=None, timeout=None):
+        self.max_in_flight = max_in_flight or Config.ASYNC_MAX_IN_FLIGHT
+        self.per_host = per_host or Config.ASYNC_PER_HOST_LIMIT
+        self.timeout = timeout or Config.SCRAPE_TIMEOUT
+        self.max_retries = Config.MAX_RETRIES
+        self.backoff_factor = Config.HTTP_RETRY_BACKOFF
+        self.headers = dict(DEFAULT_HEADERS)
+        self.rate_limiter = rate_limiter
+        self.breakers = breakers
+        self.fetcher = ConditionalFetcher(None)
+        self.browser_fetcher = None
+        self.deadline = Config.SEARCH_DEADLINE
+        self._session = None
+    
+    def _get_session(self):
+        """The shared session, opened on first use inside the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    async def get(self, url, headers):
+        """GET with retry and exponential backoff on connection errors and RETRY_STATUSES"""
+        session = self._get_session()
+        
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                async with session.get(url, headers=headers) as response:
+                    content = await response.read()
+                    if response.status not in RETRY_STATUSES or last_attempt:
+                        return AsyncResponse(url, response.status, content, response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+    
+    async def fetch(self, spec, url, variant=None):
+        """Conditionally GET a page; callers wait on the platform's rate limit first"""
+        # Every-card results can change anywhere in the result region
+        whole_region = variant == 'all'
+        if spec.js_rendered and browser_rendering_enabled():
+            if self.browser_fetcher is None:
+                self.browser_fetcher = ConditionalFetcher(get_browser_pool())
+            page = await asyncio.to_thread(
+                self.browser_fetcher.fetch, url, self.headers, Config.BROWSER_PAGE_TIMEOUT,
+                spec.fragment_marker, variant, whole_region, wait_for=spec.wait_selector
+            )
+            return self.browser_fetcher, page
+        
+        key, state, request_headers = self.fetcher.prepare(url, self.headers, variant)
+        response = await self.get(url, request_headers)
+        return self.fetcher, self.fetcher.resolve(key, state, response, spec.fragment_marker, whole_region)
+    
+    @staticmethod
+    def _extract(fetcher, spec, page, search_url, all_results):
+        page.response.raise_for_status()
+        soup = spec.parse(page.response.content)
+        if all_results:
+            return fetcher.remember(search_url, list(spec.extract_all(soup, search_url)), variant='all')
+        return fetcher.remember(search_url, spec.extract(soup, search_url))
+    
+    async def _scrape(self, spec, product_name, all_results):
+        search_url = spec.build_url(product_name)
+        fetcher, page = await self.fetch(spec, search_url, 'all' if all_results else None)
+        if page.unchanged:
+            return page.result
+        return await asyncio.to_thread(self._extract, fetcher, spec, page, search_url, all_results)
+    
+    async def _guarded_scrape(self, platform, product_name, all_results):
+        """Scrape through the platform's circuit breaker, as AdvancedScraper.guarded does"""
+        spec = get_platform(platform)
+        if spec is None:
+            raise ValueError(f"Unknown platform: {platform}")
+        
+        breaker = self.breakers.get(platform)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{platform} circuit is open")
+        
+        try:
+            await asyncio.sleep(self.rate_limiter.get_bucket(platform).reserve())
+        except asyncio.CancelledError:
+            # Deadlines and disconnects cancel us; a half-open probe must not stay claimed forever
+            breaker.release()
+            raise
+        # Tokens may be reserved minutes ahead; don't fire if the circuit opened meanwhile
+        if breaker.is_open():
+            raise CircuitOpenError(f"{platform} circuit opened while waiting on the rate limit")
+        
+        started = time.monotonic()
+        try:
+            result = await self._scrape(spec, product_name, all_results)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record('error', time.monotonic() - started, e)
+            raise
+        breaker.record('ok' if result else 'empty', time.monotonic() - started)
+        return result
+    
+    async def scrape_platform(self, platform, product_name):
+        """Scrape the first search result from any registered platform"""
+        try:
+            return await self._guarded_scrape(platform, product_name, False)
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {platform}: {e}")
+        except Exception as e:
+            logger.error(f"{platform} scraping error: {e}")
+        return None
+    
+    async def scrape_platform_all(self, platform, product_name):
+        """Scrape every listing from one platform's search page"""
+        try:
+            return await self._guarded_scrape(platform, product_name, True)
+        except CircuitOpenError as e:
+            logger.info(f"Skipping {platform}: {e}")
+        except Exception as e:
+            logger.error(f"{platform} scraping error: {e}")
+        return []
+    
+    async def search_all_platforms(self, product_name, platforms=None, deadline=None, all_results=False):
+        """Search every platform at once, returning whatever finishes within ``deadline``"""
+        deadline = self.deadline if deadline is None else deadline
+        scrape = self.scrape_platform_all if all_results else self.scrape_platform
+        
+        tasks = {
+            name: asyncio.create_task(scrape(name, product_name))
+            for name in platform_names()
+            if not platforms or name in platforms
+        }
+        if not tasks:
+            return []
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        
+        results = []
+        for platform_name, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                logger.warning(f"{platform_name} missed the {deadline}s search deadline")
+                continue
+            AdvancedScraper._collect(results, task.result())
+        return results
+    
+    async def iter_search(self, product_name, platforms=None, deadline=None, all_results=False):
+        """Async generator of ``(platform, results)`` in completion order"""
+        deadline = self.deadline if deadline is None else deadline
+        scrape = self.scrape_platform_all if all_results else self.scrape_platform
+        
+        async def run(name):
+            results = []
+            AdvancedScraper._collect(results, await scrape(name, product_name))
+            return name, results
+        
+        tasks = [
+            asyncio.create_task(run(name))
+            for name in platform_names()
+            if not platforms or name in platforms
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=deadline):
+                yield await next_done
+        except asyncio.TimeoutError:
+            logger.warning(f"{sum(not task.done() for task in tasks)} platforms missed the {deadline}s search deadline")
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def scrape_many(self, items, all_results=False):
+        """Scrape ``(platform, product_name)`` pairs concurrently, results in input order"""
+        scrape = self.scrape_platform_all if all_results else self.scrape_platform
+        return await asyncio.gather(*(scrape(platform, name) for platform, name in items))
+    
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class AsyncBackedScraper:
+    """Blocking facade over AsyncScraper with AdvancedScraper's interface
+    
+    Coroutines run on one event loop in a background thread, so app.py,
+    api.py and scheduler.py can switch engines without becoming async.
+    """
+    
+    def __init__(self, engine=None):
+        self.engine = engine or AsyncScraper()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='async-scraper', daemon=True)
+        self._thread.start()
+    
+    def run(self, coroutine):
+        """Run a coroutine on the engine's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+    
+    def get_platform_scrapers(self, platforms=None, all_results=False):
+        """Map registered platform names to scraper callables, optionally filtered"""
+        scrape = self.scrape_platform_all if all_results else self.scrape_platform
+        return {
+            name: partial(scrape, name)
+            for name in platform_names()
+            if not platforms or name in platforms
+        }
+    
+    def search_all_platforms(self, product_name, platforms=None, concurrent=True, deadline=None,
+                             all_results=False):
+        # Always concurrent; the argument is accepted for AdvancedScraper compatibility
+        return self.run(self.engine.search_all_platforms(product_name, platforms, deadline, all_results))
+    
+    def iter_search(self, product_name, platforms=None, deadline=None, all_results=False):
+        """Blocking generator over the engine's iter_search"""
+        updates = queue.Queue()
+        done = object()
+        
+        async def pump():
+            try:
+                async for update in self.engine.iter_search(product_name, platforms, deadline, all_results):
+                    updates.put(update)
+            finally:
+                updates.put(done)
+        
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while (update := updates.get()) is not done:
+                yield update
+        finally:
+            future.cancel()
+    
+    def scrape_platform(self, platform, product_name):
+        return self.run(self.engine.scrape_platform(platform, product_name))
+    
+    def scrape_platform_all(self, platform, product_name):
+        return self.run(self.engine.scrape_platform_all(platform, product_name))
+    
+    def scrape_many(self, items, all_results=False):
+        return self.run(self.engine.scrape_many(items, all_results))
+    
+    def close(self):
+        self.run(self.engine.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+def create_scraper():
+    """Scraper for the configured SCRAPER_ENGINE ('threads' or 'async')"""
+    if Config.SCRAPER_ENGINE == 'async':
+        if AIOHTTP_AVAILABLE:
+            return AsyncBackedScraper()
+        logger.warning("aiohttp is not installed, falling back to the threaded scraper")
+    return AdvancedScraper()
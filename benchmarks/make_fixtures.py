@@ -0,0 +1,90 @@
+"""Generate the synthetic search-result pages used by the benchmarks
+
+The pages mirror the markup the scrapers target (result containers and
+field classes) wrapped in the kind of navigation, inline script and
+footer bulk real search pages carry, so parse cost is realistic without
+hitting live sites. Run from the repository root:
+
+    python benchmarks/make_fixtures.py
+"""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+CARDS_PER_PAGE = 36
+
+def page_shell(title, cards, rng):
+    nav = ''.join(f'<li class="nav-item"><a href="/c/{i}">Category {i}</a></li>' for i in range(120))
+    script = 'window.__STATE__ = {' + ','.join(
+        f'"k{i}": "{rng.getrandbits(128):032x}"' for i in range(1500)
+    ) + '};'
+    footer = ''.join(f'<div class="footer-col"><p>Footer link {i}</p></div>' for i in range(200))
+    return (
+        f'<!DOCTYPE html><html><head><title>{title}</title>'
+        f'<script>{script}</script></head><body>'
+        f'<header><ul class="nav">{nav}</ul></header>'
+        f'<main id="results">{cards}</main>'
+        f'<footer>{footer}</footer></body></html>'
+    )
+
+def amazon_card(i, price, rng):
+    return (
+        '<div data-component-type="s-search-result" class="s-result-item">'
+        '<div class="s-card"><span class="s-image-wrap">'
+        f'<img class="s-image" src="https://m.media-amazon.com/images/I/{i}.jpg"></span>'
+        f'<h2 class="a-size-mini"><a class="a-link-normal" href="/dp/B0{i:08d}">'
+        f'<span class="a-text-normal">Amazon Product {i} 8GB RAM 256GB Storage</span></a></h2>'
+        f'<span class="a-icon-alt">{rng.randint(30, 50) / 10} out of 5 stars</span>'
+        f'<span class="a-price"><span class="a-price-whole">{price:,}</span></span>'
+        '<div class="a-row">' + '<span class="badge">Deal</span>' * 10 + '</div></div></div>'
+    )
+
+def flipkart_card(i, price, rng):
+    return (
+        '<div class="_1AtVbE"><div class="_2kHMtA">'
+        f'<a class="_1fQZEK" href="/p/itm{i:08d}">'
+        f'<div class="_4rR01T">Flipkart Product {i} 8GB RAM 256GB Storage</div>'
+        f'<div class="_3LWZlK">{rng.randint(30, 50) / 10}</div>'
+        f'<div class="_30jeq3">₹{price:,}</div></a>'
+        '<ul class="_1xgFaf">' + '<li class="rgWa7D">Spec line</li>' * 10 + '</ul></div></div>'
+    )
+
+def myntra_card(i, price, rng):
+    return (
+        '<li class="product-base">'
+        f'<a href="/tshirts/brand/{i}/buy">'
+        f'<h3 class="product-brand">Brand {i % 17}</h3>'
+        f'<h4 class="product-product">Myntra Product {i} Cotton T-shirt</h4>'
+        f'<div class="product-price"><span class="product-discountedPrice">Rs. {price:,}</span>'
+        f'<span class="product-strike">Rs. {price * 2:,}</span></div></a>'
+        '<div class="product-sizes">' + '<span>Size</span>' * 8 + '</div></li>'
+    )
+
+def snapdeal_card(i, price, rng):
+    return (
+        '<div class="col-xs-6 favDp product-tuple-listing">'
+        f'<a class="dp-widget-link" href="https://www.snapdeal.com/product/{i}">'
+        f'<p class="product-title">Snapdeal Product {i} Wireless Earbuds</p></a>'
+        f'<span class="lfloat product-price">Rs. {price:,}</span>'
+        '<div class="product-desc">' + '<span>Feature</span>' * 10 + '</div></div>'
+    )
+
+PLATFORMS = {
+    'amazon': amazon_card,
+    'flipkart': flipkart_card,
+    'myntra': myntra_card,
+    'snapdeal': snapdeal_card,
+}
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, make_card in PLATFORMS.items():
+        rng = random.Random(name)
+        cards = ''.join(make_card(i, rng.randint(499, 89999), rng) for i in range(CARDS_PER_PAGE))
+        path = os.path.join(FIXTURE_DIR, f'{name}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(page_shell(f'{name} search', cards, rng))
+        print(f"Wrote {path} ({os.path.getsize(path) // 1024} KB)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare HTML parsing backends on the fixture search pages
+
+Runs each AdvancedScraper.scrape_* method against its fixture page with
+html.parser and lxml, each with and without the result-container
+SoupStrainer, and reports CPU time per scrape, peak traced memory and
+whether the extracted result matches the html.parser full-tree baseline.
+Run from the repository root:
+
+    python benchmarks/parse_benchmark.py [iterations]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_scraper import AdvancedScraper
+from conditional_fetch import FetchedPage
+from config import Config
+from rate_limiter import PlatformRateLimiter
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PLATFORMS = ['Amazon', 'Flipkart', 'Myntra', 'Snapdeal']
+MODES = [
+    ('html.parser', False),
+    ('html.parser', True),
+    ('lxml', False),
+    ('lxml', True),
+]
+
+class FixtureResponse:
+    """Just enough of requests.Response for the scrapers"""
+    
+    status_code = 200
+    
+    def __init__(self, content):
+        self.content = content
+    
+    def raise_for_status(self):
+        pass
+
+def load_fixture(platform):
+    with open(os.path.join(FIXTURE_DIR, f'{platform.lower()}.html'), 'rb') as f:
+        return f.read()
+
+def fixture_scraper(content):
+    """An AdvancedScraper whose every fetch returns ``content``"""
+    scraper = AdvancedScraper()
+    scraper.rate_limiter = PlatformRateLimiter({platform: {'rate': 1e9, 'burst': 1e9} for platform in PLATFORMS})
+    scraper.fetch = lambda platform, url, variant=None: FetchedPage(FixtureResponse(content))
+    return scraper
+
+def comparable(result):
+    return {key: value for key, value in (result or {}).items() if key != 'timestamp'}
+
+def measure(scrape, platform, parser, strain, iterations):
+    Config.PLATFORM_PARSERS[platform] = parser
+    Config.HTML_STRAIN_RESULTS = strain
+    
+    started = time.process_time()
+    for _ in range(iterations):
+        scrape('benchmark')
+    cpu_ms = (time.process_time() - started) / iterations * 1000
+    
+    tracemalloc.start()
+    result = scrape('benchmark')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return cpu_ms, peak / 1024, comparable(result)
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    overrides = dict(Config.PLATFORM_PARSERS)
+    strain_default = Config.HTML_STRAIN_RESULTS
+    
+    print(f"{'platform':<10} {'parser':<12} {'strained':<9} {'cpu ms':>8} {'peak KiB':>10}  matches")
+    try:
+        for platform in PLATFORMS:
+            scraper = fixture_scraper(load_fixture(platform))
+            scrape = getattr(scraper, f'scrape_{platform.lower()}')
+            baseline = None
+            for parser, strain in MODES:
+                cpu_ms, peak_kib, result = measure(scrape, platform, parser, strain, iterations)
+                baseline = result if baseline is None else baseline
+                matches = bool(result) and result == baseline
+                print(f"{platform:<10} {parser:<12} {str(strain):<9} {cpu_ms:>8.2f} {peak_kib:>10.0f}  {matches}")
+    finally:
+        Config.PLATFORM_PARSERS.clear()
+        Config.PLATFORM_PARSERS.update(overrides)
+        Config.HTML_STRAIN_RESULTS = strain_default
+
+if __name__ == '__main__':
+    main()
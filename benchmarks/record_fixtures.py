@@ -0,0 +1,46 @@
+"""Record live search pages as benchmark fixtures
+
+Fetches each platform's search page for a query with the scraper's
+headers and saves it over benchmarks/fixtures/<platform>.html, so the
+benchmarks can run against real markup. make_fixtures.py restores the
+synthetic pages. Run from the repository root:
+
+    python benchmarks/record_fixtures.py "query" [Platform ...]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_scraper import AdvancedScraper
+from platforms import get_platform, platform_names
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def record(scraper, platform, query):
+    spec = get_platform(platform)
+    response = scraper.http.get(spec.build_url(query), headers=scraper.headers, timeout=scraper.timeout)
+    response.raise_for_status()
+    
+    cards = sum(1 for _ in spec.iter_cards(spec.parse(response.content)))
+    path = os.path.join(FIXTURE_DIR, f'{platform.lower()}.html')
+    with open(path, 'wb') as f:
+        f.write(response.content)
+    print(f"{platform}: {len(response.content)} bytes, {cards} result cards -> {path}")
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    query = sys.argv[1]
+    platforms = sys.argv[2:] or platform_names()
+    
+    scraper = AdvancedScraper()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for platform in platforms:
+        try:
+            record(scraper, platform, query)
+        except Exception as e:
+            print(f"{platform}: not recorded ({e})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""Offline throughput benchmark for the scrape paths
+
+Serves the fixture pages from a local HTTP server standing in for every
+registered platform, then drives AdvancedScraper.search_all_platforms and
+RefreshEngine.refresh (the scheduler refresh path) against it. Reports
+requests/sec, p50/p99 latency, parse time and peak traced memory. Run
+from the repository root:
+
+    python benchmarks/scrape_benchmark.py [--searches N] [--products N] [--latency MS] [--warm]
+
+Each search uses a new query, so every page is parsed; ``--warm`` repeats
+one query to measure the conditional-fetch short-circuit instead.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_scraper import AdvancedScraper
+from config import Config
+from database import Database
+from platforms import get_platform, platform_names
+from rate_limiter import PlatformRateLimiter
+from refresh_engine import RefreshEngine
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Answer /<platform>?q=... with that platform's fixture page"""
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        
+        body = server.pages.get(self.path.split('?')[0].strip('/'))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server(latency):
+    pages = {}
+    for name in platform_names():
+        path = os.path.join(FIXTURE_DIR, f'{name.lower()}.html')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                pages[name.lower()] = f.read()
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    server.daemon_threads = True
+    server.pages = pages
+    server.latency = latency
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def point_platforms_at(server):
+    """Send every fixture-backed platform to the stand-in; return a restore callback"""
+    port = server.server_address[1]
+    originals = {}
+    for name in platform_names():
+        if name.lower() in server.pages:
+            spec = get_platform(name)
+            originals[name] = spec.search_url
+            spec.search_url = f'http://127.0.0.1:{port}/{name.lower()}?q={{query}}'
+    
+    def restore():
+        for name, url in originals.items():
+            get_platform(name).search_url = url
+    return restore
+
+class Timings:
+    """Thread-safe wall-clock samples in seconds"""
+    
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+    
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.samples.append(time.perf_counter() - started)
+        return timed
+    
+    def reset(self):
+        with self._lock:
+            self.samples = []
+    
+    def snapshot(self):
+        copy = Timings()
+        with self._lock:
+            copy.samples = list(self.samples)
+        return copy
+    
+    def percentile(self, pct):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+    
+    @property
+    def total(self):
+        return sum(self.samples)
+
+def benchmark_scraper():
+    scraper = AdvancedScraper()
+    # The stand-in is local; platform rate limits would only measure sleep()
+    scraper.rate_limiter = PlatformRateLimiter({
+        name: {'rate': 1e9, 'burst': 1e9} for name in platform_names()
+    })
+    return scraper
+
+def run_searches(scraper, count, warm):
+    latency = Timings()
+    search = latency.wrap(scraper.search_all_platforms)
+    for i in range(count):
+        search('benchmark' if warm else f'benchmark {i}')
+    return latency
+
+def seed_products(db, server, count):
+    # Track the fixture's top listing, so RefreshEngine accepts the hit as the same product
+    top_urls = {}
+    for name in platform_names():
+        if name.lower() in server.pages:
+            spec = get_platform(name)
+            top_urls[name] = spec.extract(spec.parse(server.pages[name.lower()]), spec.search_url)['url']
+    
+    db.save_prices_bulk([
+        {
+            'platform': name,
+            'product_name': f'Tracked {name} {i}',
+            'price': 1000.0,
+            'currency': 'INR',
+            'url': top_urls.get(name, 'http://127.0.0.1/')
+        }
+        for name in platform_names()
+        for i in range(count)
+    ])
+    return db.get_all_tracked_products()
+
+def run_refresh(scraper, db, products):
+    latency = Timings()
+    # RefreshEngine looks the scraper methods up per cycle, so the timed version is used
+    scraper.scrape_platform = latency.wrap(AdvancedScraper.scrape_platform.__get__(scraper))
+    try:
+        stats = RefreshEngine(db, scraper).refresh(products)
+    finally:
+        del scraper.scrape_platform
+    return latency, stats
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def report(label, latency, requests, elapsed, parse, peak_kib):
+    pages = len(parse.samples)
+    print(
+        f"{label:<8} {requests:>8} {requests / elapsed:>9.1f} "
+        f"{latency.percentile(50) * 1000:>8.1f} {latency.percentile(99) * 1000:>8.1f} "
+        f"{(parse.total / pages * 1000) if pages else 0:>9.2f} {pages:>7} {peak_kib:>10.0f}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--searches', type=int, default=50, help='search_all_platforms calls')
+    parser.add_argument('--products', type=int, default=50, help='tracked products per platform')
+    parser.add_argument('--latency', type=float, default=0, help='simulated server latency in ms')
+    parser.add_argument('--warm', action='store_true', help='repeat one query so pages are unchanged')
+    args = parser.parse_args()
+    
+    server = start_server(args.latency / 1000)
+    restore = point_platforms_at(server)
+    browser_rendering = Config.BROWSER_RENDERING
+    Config.BROWSER_RENDERING = False
+    
+    parse = Timings()
+    specs = [get_platform(name) for name in platform_names()]
+    for spec in specs:
+        spec.parse = parse.wrap(spec.parse)
+    
+    workdir = tempfile.mkdtemp(prefix='scrape-benchmark-')
+    db = Database(os.path.join(workdir, 'benchmark.db'))
+    
+    print(f"{'path':<8} {'requests':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'parse ms':>9} {'parsed':>7} {'peak KiB':>10}")
+    try:
+        scraper = benchmark_scraper()
+        
+        # Search path: one call fans out to every platform
+        server.requests = 0
+        started = time.perf_counter()
+        latency = run_searches(scraper, args.searches, args.warm)
+        elapsed = time.perf_counter() - started
+        requests, parsed = server.requests, parse.snapshot()
+        peak_kib = peak_memory(lambda: run_searches(benchmark_scraper(), 1, False))
+        report('search', latency, requests, elapsed, parsed, peak_kib)
+        
+        # Scheduler refresh path: RefreshEngine with batched writes to a scratch database
+        db.init_db()
+        products = seed_products(db, server, args.products)
+        parse.reset()
+        server.requests = 0
+        started = time.perf_counter()
+        latency, stats = run_refresh(scraper, db, products)
+        elapsed = time.perf_counter() - started
+        requests, parsed = server.requests, parse.snapshot()
+        peak_kib = peak_memory(lambda: run_refresh(benchmark_scraper(), db, products[:len(specs)]))
+        report('refresh', latency, requests, elapsed, parsed, peak_kib)
+        print(f"\nrefresh: {stats['updated']}/{stats['products']} updated, {stats['written']} rows written")
+    finally:
+        for spec in specs:
+            del spec.parse
+        restore()
+        Config.BROWSER_RENDERING = browser_rendering
+        server.shutdown()
+        db.pool.close_all()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
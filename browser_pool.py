@@ -0,0 +1,181 @@
+import atexit
+import queue
+import threading
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions
+    from selenium.webdriver.support.ui import WebDriverWait
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+class RenderedResponse:
+    """Just enough of requests.Response for pages rendered in a browser"""
+    
+    status_code = 200
+    
+    def __init__(self, url, content):
+        self.url = url
+        self.content = content
+        self.headers = {}
+    
+    def raise_for_status(self):
+        pass
+
+def chrome_driver():
+    """Start a headless Chrome with images disabled"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    if Config.BROWSER_BINARY:
+        options.binary_location = Config.BROWSER_BINARY
+    
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(Config.BROWSER_PAGE_TIMEOUT)
+    return driver
+
+class PooledBrowser:
+    """A driver plus the number of pages it has rendered"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+class BrowserPool:
+    """Warm pool of reusable headless browsers for JS-rendered platforms
+    
+    At most ``size`` browsers exist and at most ``size`` pages render at
+    once; other callers wait for a free browser. Each browser is recycled
+    after ``max_pages`` pages or on any driver error, which bounds the
+    memory a long-lived browser accumulates.
+    """
+    
+    def __init__(self, size=None, max_pages=None, driver_factory=None):
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.max_pages = max_pages or Config.BROWSER_MAX_PAGES
+        self.driver_factory = driver_factory or chrome_driver
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._browsers = set()
+        self._closed = False
+    
+    def _start(self):
+        browser = PooledBrowser(self.driver_factory())
+        with self._lock:
+            self._browsers.add(browser)
+        return browser
+    
+    def _retire(self, browser):
+        with self._lock:
+            self._browsers.discard(browser)
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+    
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._start()
+    
+    def _checkin(self, browser):
+        if self._closed or browser.pages >= self.max_pages:
+            self._retire(browser)
+        else:
+            self._idle.put(browser)
+    
+    def warm(self, count=None):
+        """Start browsers ahead of the first render"""
+        for _ in range(min(count or self.size, self.size) - len(self._browsers)):
+            self._idle.put(self._start())
+    
+    def render(self, url, wait_for=None, timeout=None):
+        """Load ``url`` and return the rendered HTML once ``wait_for`` appears"""
+        timeout = timeout or Config.BROWSER_PAGE_TIMEOUT
+        
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No browser free within {timeout}s for {url}")
+        try:
+            browser = self._checkout()
+            try:
+                browser.pages += 1
+                browser.driver.get(url)
+                if wait_for and SELENIUM_AVAILABLE:
+                    try:
+                        WebDriverWait(browser.driver, timeout).until(
+                            expected_conditions.presence_of_element_located((By.CSS_SELECTOR, wait_for))
+                        )
+                    except TimeoutException:
+                        # No results is a valid outcome, the parser reports it
+                        logger.warning(f"Timed out waiting for {wait_for} on {url}")
+                html = browser.driver.page_source
+            except Exception:
+                # A browser that errored may be wedged; never hand it out again
+                self._retire(browser)
+                raise
+            self._checkin(browser)
+        finally:
+            self._slots.release()
+        
+        return html.encode('utf-8')
+    
+    def get(self, url, headers=None, timeout=None, wait_for=None):
+        """requests-style entry point so ConditionalFetcher can drive the pool"""
+        return RenderedResponse(url, self.render(url, wait_for, timeout))
+    
+    def close(self):
+        """Quit every browser, idle or not"""
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            browsers = list(self._browsers)
+        for browser in browsers:
+            self._retire(browser)
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Shared pool, created on first use so plain HTTP scraping never starts a browser"""
+    global _browser_pool
+    if _browser_pool is None:
+        with _browser_pool_lock:
+            if _browser_pool is None:
+                _browser_pool = BrowserPool()
+                atexit.register(_browser_pool.close)
+    return _browser_pool
+
+def browser_rendering_enabled():
+    return Config.BROWSER_RENDERING and SELENIUM_AVAILABLE
+
+if __name__ == '__main__':
+    # Render local fixture pages, e.g. python browser_pool.py benchmarks/fixtures/myntra.html
+    import os
+    import sys
+    import time
+    
+    pool = BrowserPool()
+    try:
+        for path in sys.argv[1:]:
+            started = time.perf_counter()
+            html = pool.render('file://' + os.path.abspath(path), wait_for='body')
+            print(f"{path}: {len(html)} bytes in {time.perf_counter() - started:.2f}s")
+    finally:
+        pool.close()
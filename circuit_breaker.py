@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+from config import Config
+from platforms import platform_names
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a platform whose circuit is open"""
+
+class CircuitBreaker:
+    """Track recent calls to one platform and stop calling it while it is failing
+    
+    The circuit opens when, over the last ``window`` calls, the share of
+    errors, empty parses or calls slower than ``slow_call`` seconds reaches
+    ``threshold``. After ``cooldown`` seconds a single probe call is let
+    through; success closes the circuit, failure opens it again.
+    """
+    
+    def __init__(self, name, window=None, min_calls=None, threshold=None,
+                 empty_threshold=None, slow_call=None, cooldown=None):
+        self.name = name
+        self.window = window or Config.BREAKER_WINDOW
+        self.min_calls = min_calls or Config.BREAKER_MIN_CALLS
+        self.threshold = threshold or Config.BREAKER_FAILURE_RATE
+        self.empty_threshold = empty_threshold or Config.BREAKER_EMPTY_RATE
+        self.slow_call = slow_call or Config.BREAKER_SLOW_CALL
+        self.cooldown = cooldown or Config.BREAKER_COOLDOWN
+        self.calls = deque(maxlen=self.window)  # (outcome, latency)
+        self.state = CLOSED
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+    
+    def is_open(self):
+        """Whether the circuit is open, e.g. after a caller waited on its rate limit"""
+        with self._lock:
+            return self.state == OPEN
+    
+    def release(self):
+        """Give back a call allowed through without recording it, e.g. one that was cancelled
+        
+        Frees the half-open probe slot so the next caller can probe instead.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+    
+    def record(self, outcome, latency, error=None):
+        """Record a call outcome: 'ok', 'empty' or 'error'"""
+        with self._lock:
+            if error is not None:
+                self.last_error = str(error)
+            self.calls.append((outcome, latency))
+            
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if outcome == 'ok' and latency < self.slow_call:
+                    self._close()
+                else:
+                    self._open(f"probe {outcome}")
+                return
+            
+            if self.state == CLOSED and len(self.calls) >= self.min_calls:
+                rates = self._rates()
+                if rates['error_rate'] >= self.threshold:
+                    self._open(f"error rate {rates['error_rate']:.0%}")
+                elif rates['empty_rate'] >= self.empty_threshold:
+                    self._open(f"empty parse rate {rates['empty_rate']:.0%}")
+                elif rates['slow_rate'] >= self.threshold:
+                    self._open(f"slow call rate {rates['slow_rate']:.0%}")
+    
+    def _open(self, reason):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(f"Circuit for {self.name} opened: {reason}")
+    
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.calls.clear()
+        logger.info(f"Circuit for {self.name} closed")
+    
+    def _rates(self):
+        total = len(self.calls) or 1
+        return {
+            'error_rate': sum(1 for outcome, _ in self.calls if outcome == 'error') / total,
+            'empty_rate': sum(1 for outcome, _ in self.calls if outcome == 'empty') / total,
+            'slow_rate': sum(1 for _, latency in self.calls if latency >= self.slow_call) / total
+        }
+    
+    def measure(self, func, *args, **kwargs):
+        """Run ``func`` and record its outcome; falsy results count as empty parses"""
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record('error', time.monotonic() - started, e)
+            raise
+        self.record('ok' if result else 'empty', time.monotonic() - started)
+        return result
+    
+    def snapshot(self):
+        """Current state and rolling-window rates for /health"""
+        with self._lock:
+            rates = self._rates()
+            latencies = [latency for _, latency in self.calls]
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0, round(self.opened_at + self.cooldown - time.monotonic(), 1))
+            return {
+                'state': self.state,
+                'calls': len(self.calls),
+                'error_rate': round(rates['error_rate'], 3),
+                'empty_rate': round(rates['empty_rate'], 3),
+                'slow_rate': round(rates['slow_rate'], 3),
+                'avg_latency': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                'retry_in': retry_in,
+                'last_error': self.last_error
+            }
+
+class BreakerRegistry:
+    """One circuit breaker per platform, created on first use"""
+    
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def get(self, platform):
+        breaker = self._breakers.get(platform)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(platform, CircuitBreaker(platform))
+        return breaker
+    
+    def snapshot(self):
+        # Include platforms that have not been scraped yet, so /health lists every one
+        for platform in platform_names():
+            self.get(platform)
+        return {platform: breaker.snapshot() for platform, breaker in sorted(self._breakers.items())}
+
+# Process-wide breakers shared by every scraper engine
+breakers = BreakerRegistry()
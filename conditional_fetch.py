@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from config import Config
+
+def strip_unchanged(result):
+    """Copy of a scrape result without the internal ``unchanged`` flag
+    
+    The flag only tells save_prices_bulk to skip the write; strip it
+    before results are returned to clients or cached.
+    """
+    return {key: value for key, value in result.items() if key != 'unchanged'}
+
+class PageState:
+    """Validators and last parsed result remembered for one URL"""
+    
+    def __init__(self, etag=None, last_modified=None, fragment_hash=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fragment_hash = fragment_hash
+        self.result = None
+
+class FetchedPage:
+    """Outcome of a conditional fetch"""
+    
+    def __init__(self, response, unchanged=False, result=None):
+        self.response = response
+        self.unchanged = unchanged
+        self.result = result
+
+class ConditionalFetcher:
+    """Send If-None-Match/If-Modified-Since and detect unchanged pages
+    
+    When the server ignores validators, the bytes following the platform's
+    result-container marker are hashed instead; a matching hash means the
+    previous parse can be reused without touching BeautifulSoup. Fetches
+    whose result covers every card hash the whole region from the marker
+    to the end of the page, since a change may be anywhere in it.
+    """
+    
+    def __init__(self, http, max_entries=None):
+        self.http = http
+        self.max_entries = max_entries or Config.CONDITIONAL_FETCH_CACHE_SIZE
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fragment_hash(content, marker=None, whole_region=False):
+        """Hash the page fragment starting at ``marker`` (or the whole page)
+        
+        Only CONDITIONAL_FRAGMENT_BYTES are hashed unless ``whole_region``.
+        """
+        start = content.find(marker) if marker else -1
+        if start < 0:
+            fragment = content
+        elif whole_region:
+            fragment = content[start:]
+        else:
+            fragment = content[start:start + Config.CONDITIONAL_FRAGMENT_BYTES]
+        return hashlib.blake2b(fragment, digest_size=16).hexdigest()
+    
+    def _get_state(self, url):
+        with self._lock:
+            state = self._states.get(url)
+            if state is not None:
+                self._states.move_to_end(url)
+            return state
+    
+    def _put_state(self, url, state):
+        with self._lock:
+            self._states[url] = state
+            self._states.move_to_end(url)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+    
+    @staticmethod
+    def _reuse(result):
+        """Copy a remembered result, flagged so callers can skip writing it again"""
+        return dict(result, unchanged=True, timestamp=datetime.now().isoformat())
+    
+    @staticmethod
+    def _reuse_all(results):
+        return [ConditionalFetcher._reuse(result) for result in results]
+    
+    def prepare(self, url, headers, variant=None):
+        """Return ``(key, state, request_headers)`` for a conditional request"""
+        key = url if variant is None else (url, variant)
+        state = self._get_state(key)
+        
+        request_headers = dict(headers)
+        # Validators are only useful when there is a parsed result to fall back on
+        if state is not None and state.result is not None:
+            if state.etag:
+                request_headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                request_headers['If-Modified-Since'] = state.last_modified
+        return key, state, request_headers
+    
+    def resolve(self, key, state, response, marker=None, whole_region=False):
+        """Turn a response into a FetchedPage, reusing the stored result if unchanged"""
+        reuse = self._reuse_all if isinstance(state and state.result, list) else self._reuse
+        
+        if response.status_code == 304 and state is not None and state.result is not None:
+            return FetchedPage(response, unchanged=True, result=reuse(state.result))
+        
+        digest = self.fragment_hash(response.content, marker, whole_region)
+        if state is not None and state.result is not None and state.fragment_hash == digest:
+            return FetchedPage(response, unchanged=True, result=reuse(state.result))
+        
+        self._put_state(key, PageState(
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fragment_hash=digest
+        ))
+        return FetchedPage(response)
+    
+    def fetch(self, url, headers, timeout, marker=None, variant=None, whole_region=False,
+              **request_kwargs):
+        """GET ``url`` and report whether it changed since the last fetch
+        
+        ``variant`` keeps separate remembered results for different
+        extractions of the same URL (e.g. first card vs. every card);
+        ``whole_region`` is for extractions that read past the first card.
+        Extra keyword arguments are passed to the underlying ``get``.
+        """
+        key, state, request_headers = self.prepare(url, headers, variant)
+        response = self.http.get(url, headers=request_headers, timeout=timeout, **request_kwargs)
+        return self.resolve(key, state, response, marker, whole_region)
+    
+    def remember(self, url, result, variant=None):
+        """Store the parsed result (or list of results) for the page last fetched from ``url``"""
+        state = self._get_state(url if variant is None else (url, variant))
+        if state is not None and result:
+            if isinstance(result, list):
+                state.result = [strip_unchanged(r) for r in result]
+            else:
+                state.result = strip_unchanged(result)
+        return result
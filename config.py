@@ -12,6 +12,21 @@ class Config:
     
     # Database settings
     DATABASE_NAME = 'prices.db'
+    SQLITE_BUSY_TIMEOUT = 30  # seconds to wait on a locked database
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))  # negative = KiB, i.e. 64 MiB
+    PRICE_WRITE_BATCH_SIZE = 500  # scrape results per bulk insert transaction
+    
+    # Price history retention tiers (days)
+    RETENTION_RAW_DAYS = int(os.getenv('RETENTION_RAW_DAYS', '30'))  # every observation kept
+    RETENTION_HOURLY_DAYS = int(os.getenv('RETENTION_HOURLY_DAYS', '90'))  # then lowest and last per hour
+    RETENTION_DAILY_DAYS = int(os.getenv('RETENTION_DAILY_DAYS', '365'))  # then per day, then per week
+    RETENTION_BATCH_SIZE = 5000  # rows deleted per transaction
+    RETENTION_BATCH_PAUSE = 0.05  # seconds between delete transactions
+    RETENTION_VACUUM_PAGES = 1000  # pages released per incremental vacuum step
+    # Samples older than this move from SQLite to the columnar archive; 0 keeps them in SQLite
+    PRICE_ARCHIVE_AFTER_DAYS = int(os.getenv('PRICE_ARCHIVE_AFTER_DAYS', '365'))
+    PRICE_ARCHIVE_BLOCK_ROWS = 4096  # samples per archive block
     
     # Email settings for alerts
     SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -22,13 +37,57 @@ class Config:
     # Scraping settings
     SCRAPE_TIMEOUT = 10
     MAX_RETRIES = 3
+    SCRAPE_MAX_WORKERS = int(os.getenv('SCRAPE_MAX_WORKERS', '8'))
+    BREAKER_WINDOW = 20  # recent calls per platform considered by its circuit breaker
+    BREAKER_MIN_CALLS = 5  # calls needed before the circuit can open
+    BREAKER_FAILURE_RATE = 0.5  # error or slow-call share that opens the circuit
+    BREAKER_EMPTY_RATE = 0.8  # empty-parse share that opens it (markup change or blocking)
+    BREAKER_SLOW_CALL = 8  # seconds
+    BREAKER_COOLDOWN = int(os.getenv('BREAKER_COOLDOWN', '120'))  # seconds before a probe call
+    SCRAPER_ENGINE = os.getenv('SCRAPER_ENGINE', 'threads')  # 'threads' or 'async' (needs aiohttp)
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '200'))  # open requests across all hosts
+    ASYNC_PER_HOST_LIMIT = int(os.getenv('ASYNC_PER_HOST_LIMIT', '8'))  # open requests per platform host
+    SEARCH_DEADLINE = float(os.getenv('SEARCH_DEADLINE', '15'))  # seconds for a whole multi-platform search
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))  # keep-alive connections per host
+    HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '1'))
+    HTML_PARSER = os.getenv('HTML_PARSER', 'lxml')  # 'lxml' or 'html.parser'
+    PLATFORM_PARSERS = {}  # per-platform overrides, e.g. {'Myntra': 'html.parser'}
+    HTML_STRAIN_RESULTS = True  # build only the result containers, not the whole page
+    MAX_RESULTS_PER_PAGE = 40  # listings ingested from one search page in multi-result mode
+    BROWSER_RENDERING = os.getenv('BROWSER_RENDERING', 'False') == 'True'  # headless browser for JS-rendered platforms
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))  # browsers kept warm, also the render concurrency cap
+    BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', '50'))  # pages rendered before a browser is recycled
+    BROWSER_PAGE_TIMEOUT = int(os.getenv('BROWSER_PAGE_TIMEOUT', '20'))
+    BROWSER_BINARY = os.getenv('BROWSER_BINARY', '')
+    # Store every listing on a search page; the scheduler refreshes them by re-fetching that page,
+    # one request per query and platform
+    SEARCH_INGEST_ALL_RESULTS = os.getenv('SEARCH_INGEST_ALL_RESULTS', 'True') == 'True'
+    CONDITIONAL_FETCH_CACHE_SIZE = 5000  # URLs whose validators and last result are remembered
+    CONDITIONAL_FRAGMENT_BYTES = 16 * 1024  # bytes hashed from the result container onwards
     
     # Supported platforms
     PLATFORMS = ['Amazon', 'Flipkart', 'Myntra', 'Snapdeal']
     
+    # Polite request rate (requests/second, burst size) for platforms that don't set one
+    DEFAULT_RATE_LIMIT = {'rate': 0.5, 'burst': 1}
+    REFRESH_WORKERS_PER_PLATFORM = int(os.getenv('REFRESH_WORKERS_PER_PLATFORM', '2'))
+    
+    # Adaptive refresh scheduling (seconds)
+    REFRESH_BASE_INTERVAL = 6 * 3600
+    REFRESH_MIN_INTERVAL = 30 * 60
+    REFRESH_MAX_INTERVAL = 48 * 3600
+    REFRESH_VOLATILITY_WEIGHT = 20  # a 5% coefficient of variation halves the interval
+    REFRESH_ALERT_WEIGHT = 0.5  # each active alert shortens the interval
+    REFRESH_STALE_DAYS = 7  # unchanged this long doubles the interval
+    REFRESH_MAX_PER_TICK = 500  # most-overdue products scraped per scheduler tick
+    
     # Price alert settings
     ALERT_CHECK_INTERVAL = 3600  # Check every hour
     PRICE_DROP_THRESHOLD = 5  # Alert if price drops by 5% or more
     
+    # Search result cache
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '300'))  # seconds
+    SEARCH_CACHE_MAX_BYTES = int(os.getenv('SEARCH_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    
     # API settings
     API_RATE_LIMIT = 100  # requests per hour
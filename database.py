@@ -1,16 +1,269 @@
+import os
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
 import json
+from config import Config
+from price_archive import PriceArchive
+
+# Schema migrations applied in order on top of the base tables; the
+# database's PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    # 1: merge duplicate products, then index the hot lookups
+    '''
+    CREATE TEMP TABLE product_canonical AS
+        SELECT p.id, (
+            SELECT MIN(d.id) FROM products d
+            WHERE d.name = p.name AND d.platform = p.platform
+        ) AS canonical_id
+        FROM products p;
+    
+    UPDATE price_history SET product_id = (
+        SELECT canonical_id FROM product_canonical WHERE id = price_history.product_id
+    ) WHERE product_id IN (SELECT id FROM product_canonical WHERE id != canonical_id);
+    
+    UPDATE alerts SET product_id = (
+        SELECT canonical_id FROM product_canonical WHERE id = alerts.product_id
+    ) WHERE product_id IN (SELECT id FROM product_canonical WHERE id != canonical_id);
+    
+    DELETE FROM products WHERE id IN (
+        SELECT id FROM product_canonical WHERE id != canonical_id
+    );
+    DROP TABLE product_canonical;
+    
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_products_name_platform
+        ON products (name, platform);
+    CREATE INDEX IF NOT EXISTS idx_price_history_product_time
+        ON price_history (product_id, timestamp);
+    ''',
+    
+    # 2: alerts are evaluated at ingest time and queued for notification
+    '''
+    ALTER TABLE alerts ADD COLUMN email TEXT;
+    ALTER TABLE alerts ADD COLUMN triggered_price REAL;
+    ALTER TABLE alerts ADD COLUMN triggered_at TIMESTAMP;
+    ALTER TABLE alerts ADD COLUMN notified BOOLEAN DEFAULT 0;
+    UPDATE alerts SET notified = 1 WHERE active = 0;
+    
+    CREATE INDEX IF NOT EXISTS idx_alerts_active_target
+        ON alerts (product_id, target_price) WHERE active = 1;
+    CREATE INDEX IF NOT EXISTS idx_alerts_pending
+        ON alerts (id) WHERE active = 0 AND notified = 0;
+    ''',
+    
+    # 3: newest price per product, kept current by a trigger
+    '''
+    CREATE TABLE IF NOT EXISTS latest_prices (
+        product_id INTEGER PRIMARY KEY,
+        price REAL NOT NULL,
+        currency TEXT DEFAULT 'INR',
+        timestamp TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES products (id)
+    );
+    
+    INSERT OR REPLACE INTO latest_prices (product_id, price, currency, timestamp)
+        SELECT ph.product_id, ph.price, ph.currency, ph.timestamp
+        FROM price_history ph
+        WHERE ph.id = (
+            SELECT id FROM price_history
+            WHERE product_id = ph.product_id
+            ORDER BY timestamp DESC, id DESC
+            LIMIT 1
+        );
+    
+    CREATE TRIGGER IF NOT EXISTS trg_price_history_latest
+    AFTER INSERT ON price_history
+    BEGIN
+        INSERT INTO latest_prices (product_id, price, currency, timestamp)
+        VALUES (NEW.product_id, NEW.price, NEW.currency, NEW.timestamp)
+        ON CONFLICT (product_id) DO UPDATE SET
+            price = excluded.price,
+            currency = excluded.currency,
+            timestamp = excluded.timestamp
+        WHERE excluded.timestamp >= latest_prices.timestamp;
+    END;
+    ''',
+    # 4: daily OHLC-style aggregates per product, maintained at ingest
+    '''
+    CREATE TABLE IF NOT EXISTS price_daily (
+        product_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        open_price REAL NOT NULL,
+        open_ts TIMESTAMP NOT NULL,
+        close_price REAL NOT NULL,
+        close_ts TIMESTAMP NOT NULL,
+        min_price REAL NOT NULL,
+        max_price REAL NOT NULL,
+        samples INTEGER NOT NULL,
+        price_sum REAL NOT NULL,
+        price_sum_squares REAL NOT NULL,
+        PRIMARY KEY (product_id, day)
+    ) WITHOUT ROWID;
+    
+    INSERT OR REPLACE INTO price_daily
+    SELECT product_id, day,
+           MAX(CASE WHEN first_rank = 1 THEN price END), MIN(timestamp),
+           MAX(CASE WHEN last_rank = 1 THEN price END), MAX(timestamp),
+           MIN(price), MAX(price), COUNT(*), SUM(price), SUM(price * price)
+    FROM (
+        SELECT product_id, date(timestamp) AS day, price, timestamp,
+               ROW_NUMBER() OVER (PARTITION BY product_id, date(timestamp)
+                                  ORDER BY timestamp, id) AS first_rank,
+               ROW_NUMBER() OVER (PARTITION BY product_id, date(timestamp)
+                                  ORDER BY timestamp DESC, id DESC) AS last_rank
+        FROM price_history
+    )
+    GROUP BY product_id, day;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_price_history_daily
+    AFTER INSERT ON price_history
+    BEGIN
+        INSERT INTO price_daily
+        VALUES (NEW.product_id, date(NEW.timestamp), NEW.price, NEW.timestamp, NEW.price,
+                NEW.timestamp, NEW.price, NEW.price, 1, NEW.price, NEW.price * NEW.price)
+        ON CONFLICT (product_id, day) DO UPDATE SET
+            open_price = CASE WHEN excluded.open_ts < open_ts THEN excluded.open_price ELSE open_price END,
+            open_ts = MIN(open_ts, excluded.open_ts),
+            close_price = CASE WHEN excluded.close_ts >= close_ts THEN excluded.close_price ELSE close_price END,
+            close_ts = MAX(close_ts, excluded.close_ts),
+            min_price = MIN(min_price, excluded.min_price),
+            max_price = MAX(max_price, excluded.max_price),
+            samples = samples + 1,
+            price_sum = price_sum + excluded.price_sum,
+            price_sum_squares = price_sum_squares + excluded.price_sum_squares;
+    END;
+    ''',
+    
+    # 5: weekly aggregates that daily rows are rolled into once they age out
+    '''
+    CREATE TABLE IF NOT EXISTS price_weekly (
+        product_id INTEGER NOT NULL,
+        week TEXT NOT NULL,
+        open_price REAL NOT NULL,
+        open_ts TIMESTAMP NOT NULL,
+        close_price REAL NOT NULL,
+        close_ts TIMESTAMP NOT NULL,
+        min_price REAL NOT NULL,
+        max_price REAL NOT NULL,
+        samples INTEGER NOT NULL,
+        price_sum REAL NOT NULL,
+        price_sum_squares REAL NOT NULL,
+        PRIMARY KEY (product_id, week)
+    ) WITHOUT ROWID;
+    ''',
+    
+    # 6: listings ingested from a search page remember it, so refreshes re-run the page
+    '''
+    ALTER TABLE products ADD COLUMN search_query TEXT;
+    
+    CREATE INDEX IF NOT EXISTS idx_products_search_query
+        ON products (platform, search_query) WHERE search_query IS NOT NULL;
+    ''',
+]
+
+# Bucket expressions for downsampling price_history; weeks start on Monday
+PRICE_BUCKETS = {
+    'hour': "strftime('%Y-%m-%d %H', timestamp)",
+    'day': 'date(timestamp)',
+    'week': "date(timestamp, 'weekday 0', '-6 days')"
+}
+
+# (name, platform) pairs per lookup, keeping well under SQLite's bound-variable limit
+BULK_LOOKUP_CHUNK = 400
+
+def format_timestamp(epoch):
+    """Epoch seconds as SQLite's CURRENT_TIMESTAMP text"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+class PooledConnection:
+    """Thread-local holder whose lifetime bounds its connection's"""
+    
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn):
+        self.conn = conn
+
+class ConnectionPool:
+    """One persistent, WAL-mode SQLite connection per thread"""
+    
+    _pools = {}
+    _pools_lock = threading.Lock()
+    
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self._local = threading.local()
+        self._connections = set()
+        # Reentrant: a finalizer may close a connection while this thread holds the lock
+        self._lock = threading.RLock()
+    
+    @classmethod
+    def for_database(cls, db_name):
+        """Return the pool shared by every Database pointing at ``db_name``"""
+        with cls._pools_lock:
+            pool = cls._pools.get(db_name)
+            if pool is None:
+                pool = cls(db_name)
+                cls._pools[db_name] = pool
+            return pool
+    
+    def _open(self):
+        # Each connection is only used by its own thread, but may be closed by another
+        conn = sqlite3.connect(self.db_name, timeout=Config.SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        # Only takes effect on a new database; older ones need `python retention.py --enable-incremental-vacuum`
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}')
+        conn.execute(f'PRAGMA cache_size={int(Config.SQLITE_CACHE_SIZE)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def get_connection(self):
+        """Return this thread's connection, opening it on first use"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = PooledConnection(self._open())
+            self._local.holder = holder
+            with self._lock:
+                self._connections.add(holder.conn)
+            # The thread-local holder is dropped when its thread exits; close the connection with it
+            weakref.finalize(holder, self._release, holder.conn)
+        return holder.conn
+    
+    def _release(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+        conn.close()
+    
+    def close_all(self):
+        """Close every connection opened by the pool"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
 class Database:
     """Database handler for price tracking"""
     
     def __init__(self, db_name='prices.db'):
         self.db_name = db_name
+        self.pool = ConnectionPool.for_database(db_name)
+        # Cold price history exported by RetentionEngine, e.g. prices_archive/ beside prices.db
+        self.archive = PriceArchive(os.path.splitext(db_name)[0] + '_archive')
+        # Called with no arguments after a write triggers one or more alerts
+        self.on_alerts_triggered = None
+    
+    def get_connection(self):
+        """Return the pooled connection for the current thread"""
+        return self.pool.get_connection()
     
     def init_db(self):
         """Initialize database tables"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         # Products table
@@ -49,94 +302,601 @@ class Database:
         ''')
         
         conn.commit()
-        conn.close()
+        
+        self.migrate()
+    
+    def migrate(self):
+        """Apply any schema migrations this database has not seen yet"""
+        conn = self.get_connection()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            try:
+                conn.executescript(f'''
+                    BEGIN;
+                    {script}
+                    PRAGMA user_version = {number};
+                    COMMIT;
+                ''')
+            except sqlite3.Error:
+                conn.rollback()
+                raise
     
     def save_price(self, product_data):
         """Save product price to database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        conn = self.get_connection()
         
-        # Check if product exists
-        cursor.execute('''
-            SELECT id FROM products 
-            WHERE name = ? AND platform = ?
-        ''', (product_data['product_name'], product_data['platform']))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            product_id = result[0]
-        else:
-            # Insert new product
+        with conn:
+            cursor = conn.cursor()
+            
+            # Resolve or create the product in one statement
             cursor.execute('''
                 INSERT INTO products (name, platform, url)
                 VALUES (?, ?, ?)
+                ON CONFLICT (name, platform) DO UPDATE SET url = excluded.url
+                RETURNING id
             ''', (product_data['product_name'], product_data['platform'], product_data['url']))
-            product_id = cursor.lastrowid
+            product_id = cursor.fetchone()[0]
+            
+            # Insert price history
+            cursor.execute('''
+                INSERT INTO price_history (product_id, price, currency)
+                VALUES (?, ?, ?)
+            ''', (product_id, product_data['price'], product_data['currency']))
+            
+            triggered = self._evaluate_alerts(cursor, {product_id: product_data['price']})
         
-        # Insert price history
-        cursor.execute('''
-            INSERT INTO price_history (product_id, price, currency)
-            VALUES (?, ?, ?)
-        ''', (product_id, product_data['price'], product_data['currency']))
+        self._notify_triggered(triggered)
+        return product_id
+    
+    def save_prices_bulk(self, results):
+        """Save many scrape results in a single transaction
         
-        conn.commit()
-        conn.close()
+        Products are upserted with one executemany, their ids resolved in
+        chunked lookups, and every price row written with one executemany.
+        Results flagged ``unchanged`` by the conditional fetcher only bump
+        the product's last-checked time. A result's ``search_query`` marks the
+        product as ingested from that search page. Returns the product ids
+        in input order.
+        """
+        results = [r for r in results if r]
+        if not results:
+            return []
         
-        return product_id
+        conn = self.get_connection()
+        
+        with conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                INSERT INTO products (name, platform, url, search_query)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (name, platform) DO UPDATE SET
+                    url = excluded.url,
+                    search_query = COALESCE(excluded.search_query, search_query)
+            ''', [(r['product_name'], r['platform'], r['url'], r.get('search_query')) for r in results])
+            
+            keys = list({(r['product_name'], r['platform']) for r in results})
+            product_ids = {}
+            for start in range(0, len(keys), BULK_LOOKUP_CHUNK):
+                chunk = keys[start:start + BULK_LOOKUP_CHUNK]
+                placeholders = ', '.join(['(?, ?)'] * len(chunk))
+                params = [value for key in chunk for value in key]
+                cursor.execute(f'''
+                    SELECT id, name, platform FROM products
+                    WHERE (name, platform) IN (VALUES {placeholders})
+                ''', params)
+                for product_id, name, platform in cursor.fetchall():
+                    product_ids[(name, platform)] = product_id
+            
+            ids = [product_ids[(r['product_name'], r['platform'])] for r in results]
+            changed = [(product_id, r) for product_id, r in zip(ids, results) if not r.get('unchanged')]
+            unchanged = [product_id for product_id, r in zip(ids, results) if r.get('unchanged')]
+            
+            cursor.executemany('''
+                INSERT INTO price_history (product_id, price, currency)
+                VALUES (?, ?, ?)
+            ''', [(product_id, r['price'], r.get('currency', 'INR')) for product_id, r in changed])
+            
+            cursor.executemany('''
+                UPDATE latest_prices SET timestamp = CURRENT_TIMESTAMP
+                WHERE product_id = ?
+            ''', [(product_id,) for product_id in unchanged])
+            
+            # Only the newest price in the batch matters for each product
+            latest = {product_id: r['price'] for product_id, r in changed}
+            triggered = self._evaluate_alerts(cursor, latest)
+        
+        self._notify_triggered(triggered)
+        return ids
     
-    def get_price_history(self, product_id):
-        """Get price history for a product"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def get_price_history(self, product_id, days=None):
+        """Get price history for a product, newest first
         
-        cursor.execute('''
-            SELECT price, timestamp 
-            FROM price_history 
-            WHERE product_id = ?
-            ORDER BY timestamp DESC
-            LIMIT 30
-        ''', (product_id,))
+        With ``days``, every sample in that window; otherwise the latest 30.
+        Samples moved to the cold archive are merged in transparently.
+        """
+        cursor = self.get_connection().cursor()
+        archived_until = self.archive.last_timestamp(product_id)
+        # Rows up to the archive's newest sample are read from the archive only
+        hot_after = format_timestamp(archived_until) if archived_until is not None else ''
+        
+        if days is None:
+            cursor.execute('''
+                SELECT price, timestamp
+                FROM price_history
+                WHERE product_id = ? AND timestamp > ?
+                ORDER BY timestamp DESC
+                LIMIT 30
+            ''', (product_id, hot_after))
+        else:
+            cursor.execute('''
+                SELECT price, timestamp
+                FROM price_history
+                WHERE product_id = ? AND timestamp > ? AND timestamp >= datetime('now', ?)
+                ORDER BY timestamp DESC
+            ''', (product_id, hot_after, f'-{int(days)} days'))
         
         history = [{'price': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
         
-        conn.close()
+        if archived_until is not None:
+            if days is None:
+                cold = self.archive.read(product_id, limit=30 - len(history)) if len(history) < 30 else []
+            else:
+                cold = self.archive.read(product_id, since=int(time.time()) - int(days) * 86400)
+            history.extend(
+                {'price': price, 'timestamp': format_timestamp(ts)}
+                for ts, price in reversed(cold)
+            )
+        
         return history
     
-    def set_alert(self, product_id, target_price):
-        """Set price alert for a product"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def get_all_tracked_products(self):
+        """Get (id, name, platform, url, search_query) for every product we track"""
+        cursor = self.get_connection().cursor()
+        
+        cursor.execute('SELECT id, name, platform, url, search_query FROM products ORDER BY platform, id')
+        
+        return cursor.fetchall()
+    
+    def get_daily_aggregates(self, product_ids, days=90):
+        """Daily aggregates of many products over the last ``days`` days
+        
+        Returns (product_id, day, open_price, close_price, min_price,
+        max_price, samples, price_sum, price_sum_squares) rows ordered by
+        product, then oldest day first.
+        """
+        product_ids = list(product_ids)
+        cursor = self.get_connection().cursor()
+        rows = []
+        
+        for start in range(0, len(product_ids), BULK_LOOKUP_CHUNK):
+            chunk = product_ids[start:start + BULK_LOOKUP_CHUNK]
+            placeholders = ', '.join(['?'] * len(chunk))
+            cursor.execute(f'''
+                SELECT product_id, day, open_price, close_price, min_price, max_price,
+                       samples, price_sum, price_sum_squares
+                FROM price_daily
+                WHERE product_id IN ({placeholders}) AND day >= date('now', ?)
+                ORDER BY product_id, day
+            ''', chunk + [f'-{int(days)} days'])
+            rows.extend(cursor.fetchall())
+        
+        return rows
+    
+    def get_refresh_signals(self, days=30, product_ids=None):
+        """Get per-product inputs for adaptive refresh scheduling
+        
+        Returns price count/sum/sum-of-squares over the window, active
+        alert count, when the product was first seen and last scraped, and
+        when its price last differed from the current one.
+        """
+        cursor = self.get_connection().cursor()
+        
+        where = ''
+        params = [f'-{int(days)} days']
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            if not product_ids:
+                return []
+            where = f"WHERE p.id IN ({', '.join(['?'] * len(product_ids))})"
+            params.extend(product_ids)
+        
+        cursor.execute(f'''
+            SELECT p.id, p.name, p.platform,
+                   COALESCE(SUM(d.samples), 0), SUM(d.price_sum), SUM(d.price_sum_squares),
+                   (SELECT COUNT(*) FROM alerts a
+                    WHERE a.product_id = p.id AND a.active = 1),
+                   lp.timestamp,
+                   (SELECT MAX(c.timestamp) FROM price_history c
+                    WHERE c.product_id = p.id AND c.price != lp.price),
+                   p.created_at, p.url, p.search_query
+            FROM products p
+            LEFT JOIN latest_prices lp ON lp.product_id = p.id
+            LEFT JOIN price_daily d
+                ON d.product_id = p.id AND d.day >= date('now', ?)
+            {where}
+            GROUP BY p.id
+        ''', params)
+        
+        return [
+            {
+                'product_id': row[0],
+                'name': row[1],
+                'platform': row[2],
+                'samples': row[3],
+                'price_sum': row[4] or 0,
+                'price_sum_squares': row[5] or 0,
+                'active_alerts': row[6],
+                'last_checked': row[7],
+                'last_changed': row[8],
+                'first_seen': row[9],
+                'url': row[10],
+                'search_query': row[11]
+            }
+            for row in cursor.fetchall()
+        ]
+    
+    def get_latest_prices(self, product_ids):
+        """Get the current price of many products in one query, keyed by product id"""
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+        
+        cursor = self.get_connection().cursor()
+        latest = {}
+        
+        for start in range(0, len(product_ids), BULK_LOOKUP_CHUNK):
+            chunk = product_ids[start:start + BULK_LOOKUP_CHUNK]
+            placeholders = ', '.join(['?'] * len(chunk))
+            cursor.execute(f'''
+                SELECT product_id, price, currency, timestamp
+                FROM latest_prices
+                WHERE product_id IN ({placeholders})
+            ''', chunk)
+            for product_id, price, currency, timestamp in cursor.fetchall():
+                latest[product_id] = {'price': price, 'currency': currency, 'timestamp': timestamp}
+        
+        return latest
+    
+    def get_latest_price(self, product_id):
+        """Get the current price of a product, or None"""
+        return self.get_latest_prices([product_id]).get(product_id)
+    
+    def get_all_users_with_alerts(self):
+        """Emails of users with at least one active alert"""
+        cursor = self.get_connection().cursor()
         
         cursor.execute('''
-            INSERT INTO alerts (product_id, target_price)
-            VALUES (?, ?)
-        ''', (product_id, target_price))
+            SELECT DISTINCT email FROM alerts
+            WHERE active = 1 AND email IS NOT NULL AND email != ''
+        ''')
         
-        conn.commit()
-        conn.close()
+        return [row[0] for row in cursor.fetchall()]
+    
+    def get_user_tracked_products(self, email):
+        """Products a user has active alerts on, as dicts with id, name, platform and url"""
+        cursor = self.get_connection().cursor()
+        
+        cursor.execute('''
+            SELECT DISTINCT p.id, p.name, p.platform, p.url
+            FROM alerts a
+            JOIN products p ON p.id = a.product_id
+            WHERE a.email = ? AND a.active = 1
+        ''', (email,))
+        
+        return [
+            {'id': row[0], 'name': row[1], 'platform': row[2], 'url': row[3]}
+            for row in cursor.fetchall()
+        ]
+    
+    def get_latest_prices_by_product(self, product_name):
+        """Get the cheapest current listing per platform for a product name"""
+        cursor = self.get_connection().cursor()
+        
+        # SQLite returns the other columns from the row holding MIN(price)
+        cursor.execute('''
+            SELECT p.platform, MIN(lp.price), p.url, lp.timestamp
+            FROM products p
+            JOIN latest_prices lp ON lp.product_id = p.id
+            WHERE p.name LIKE ?
+            GROUP BY p.platform
+        ''', (f'%{product_name}%',))
+        
+        return [
+            {'platform': row[0], 'price': row[1], 'url': row[2], 'timestamp': row[3]}
+            for row in cursor.fetchall()
+        ]
+    
+    def set_alert(self, product_id, target_price, email=None):
+        """Set price alert for a product"""
+        conn = self.get_connection()
+        
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO alerts (product_id, target_price, email)
+                VALUES (?, ?, ?)
+            ''', (product_id, target_price, email))
+            alert_id = cursor.lastrowid
+            
+            # The current price may already satisfy the new alert
+            cursor.execute('''
+                SELECT price FROM latest_prices WHERE product_id = ?
+            ''', (product_id,))
+            row = cursor.fetchone()
+            triggered = self._evaluate_alerts(cursor, {product_id: row[0]}) if row else 0
+        
+        self._notify_triggered(triggered)
+        return alert_id
+    
+    def _evaluate_alerts(self, cursor, prices):
+        """Trigger active alerts whose target is met by the new prices
+        
+        Only the alerts of the given products are touched, through the
+        partial (product_id, target_price) index. Returns how many fired.
+        """
+        cursor.executemany('''
+            UPDATE alerts
+            SET active = 0, triggered_price = ?, triggered_at = CURRENT_TIMESTAMP
+            WHERE product_id = ? AND active = 1 AND target_price >= ?
+        ''', [(price, product_id, price) for product_id, price in prices.items()])
+        return max(cursor.rowcount, 0)
+    
+    def _notify_triggered(self, triggered):
+        if triggered and self.on_alerts_triggered:
+            self.on_alerts_triggered()
     
     def check_alerts(self):
-        """Check if any alerts should be triggered"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        """Get triggered alerts that have not been notified yet"""
+        cursor = self.get_connection().cursor()
         
         cursor.execute('''
-            SELECT a.id, p.name, a.target_price, ph.price
+            SELECT a.id, p.name, a.target_price, a.triggered_price, a.email, p.url
             FROM alerts a
             JOIN products p ON a.product_id = p.id
-            JOIN price_history ph ON p.id = ph.product_id
-            WHERE a.active = 1
-            AND ph.price <= a.target_price
-            AND ph.id = (
-                SELECT MAX(id) FROM price_history WHERE product_id = p.id
-            )
+            WHERE a.active = 0 AND a.notified = 0
+            ORDER BY a.id
         ''')
         
         triggered_alerts = cursor.fetchall()
-        conn.close()
         
         return triggered_alerts
+    
+    def claim_alert_notification(self, alert_id):
+        """Mark an alert as notified; False if another worker already claimed it"""
+        conn = self.get_connection()
+        
+        with conn:
+            cursor = conn.execute('''
+                UPDATE alerts SET notified = 1
+                WHERE id = ? AND active = 0 AND notified = 0
+            ''', (alert_id,))
+        
+        return cursor.rowcount == 1
+    
+    def release_alert_notification(self, alert_id):
+        """Put an alert back in the notification queue after a failed send"""
+        conn = self.get_connection()
+        
+        with conn:
+            conn.execute('UPDATE alerts SET notified = 0 WHERE id = ?', (alert_id,))
+    
+    def deactivate_alert(self, alert_id):
+        """Cancel an alert without notifying"""
+        conn = self.get_connection()
+        
+        with conn:
+            conn.execute('''
+                UPDATE alerts SET active = 0, notified = 1
+                WHERE id = ?
+            ''', (alert_id,))
+    
+    def downsample_prices(self, bucket, older_than, newer_than=None, batch_size=5000, pause=0):
+        """Thin price_history rows between two ages to at most two per product and ``bucket``
+        
+        ``bucket`` is a PRICE_BUCKETS key and the ages are in days. The
+        lowest and the last price of each bucket are kept, so long-term lows
+        survive; exact daily figures stay in price_daily. Victims are found
+        in one read, then deleted ``batch_size`` rows per transaction with
+        ``pause`` seconds between transactions so writers are never blocked
+        for long. Returns the number of rows deleted.
+        """
+        conn = self.get_connection()
+        bucket_expr = PRICE_BUCKETS[bucket]
+        window = "timestamp < date('now', ?)"
+        params = [f'-{int(older_than)} days']
+        if newer_than is not None:
+            window += " AND timestamp >= date('now', ?)"
+            params.append(f'-{int(newer_than)} days')
+        
+        with conn:
+            conn.execute('DROP TABLE IF EXISTS temp.retention_victims')
+            conn.execute('CREATE TEMP TABLE retention_victims (id INTEGER PRIMARY KEY)')
+            conn.execute(f'''
+                INSERT INTO retention_victims
+                SELECT id FROM (
+                    SELECT id,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, {bucket_expr}
+                                              ORDER BY price, timestamp, id) AS low_rank,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, {bucket_expr}
+                                              ORDER BY timestamp DESC, id DESC) AS last_rank
+                    FROM price_history
+                    WHERE {window}
+                )
+                WHERE low_rank > 1 AND last_rank > 1
+            ''', params)
+        
+        deleted = 0
+        last_id = 0
+        try:
+            while True:
+                batch_end = conn.execute('''
+                    SELECT MAX(id) FROM (
+                        SELECT id FROM retention_victims WHERE id > ? ORDER BY id LIMIT ?
+                    )
+                ''', (last_id, batch_size)).fetchone()[0]
+                if batch_end is None:
+                    break
+                
+                with conn:
+                    cursor = conn.execute('''
+                        DELETE FROM price_history WHERE id IN (
+                            SELECT id FROM retention_victims WHERE id > ? AND id <= ?
+                        )
+                    ''', (last_id, batch_end))
+                deleted += cursor.rowcount
+                last_id = batch_end
+                if pause:
+                    time.sleep(pause)
+        finally:
+            with conn:
+                conn.execute('DROP TABLE IF EXISTS temp.retention_victims')
+        
+        return deleted
+    
+    def rollup_daily_aggregates(self, older_than, batch_size=5000, pause=0):
+        """Merge price_daily rows older than ``older_than`` days into price_weekly
+        
+        Moves ``batch_size`` daily rows per transaction; a week split across
+        batches is merged by the upsert. Returns the number of daily rows
+        rolled up.
+        """
+        conn = self.get_connection()
+        cutoff = f'-{int(older_than)} days'
+        rolled_up = 0
+        
+        while True:
+            with conn:
+                conn.execute('DROP TABLE IF EXISTS temp.retention_days')
+                conn.execute('''
+                    CREATE TEMP TABLE retention_days AS
+                    SELECT product_id, day FROM price_daily
+                    WHERE day < date('now', ?)
+                    ORDER BY product_id, day
+                    LIMIT ?
+                ''', (cutoff, batch_size))
+                count = conn.execute('SELECT COUNT(*) FROM retention_days').fetchone()[0]
+                
+                # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+                conn.execute('''
+                    INSERT INTO price_weekly
+                    SELECT product_id, week,
+                           MAX(CASE WHEN first_rank = 1 THEN open_price END), MIN(open_ts),
+                           MAX(CASE WHEN last_rank = 1 THEN close_price END), MAX(close_ts),
+                           MIN(min_price), MAX(max_price),
+                           SUM(samples), SUM(price_sum), SUM(price_sum_squares)
+                    FROM (
+                        SELECT d.product_id, d.open_price, d.open_ts, d.close_price, d.close_ts,
+                               d.min_price, d.max_price, d.samples, d.price_sum, d.price_sum_squares,
+                               date(d.day, 'weekday 0', '-6 days') AS week,
+                               ROW_NUMBER() OVER (PARTITION BY d.product_id, date(d.day, 'weekday 0', '-6 days')
+                                                  ORDER BY d.open_ts) AS first_rank,
+                               ROW_NUMBER() OVER (PARTITION BY d.product_id, date(d.day, 'weekday 0', '-6 days')
+                                                  ORDER BY d.close_ts DESC) AS last_rank
+                        FROM price_daily d
+                        JOIN retention_days r ON r.product_id = d.product_id AND r.day = d.day
+                    )
+                    WHERE true
+                    GROUP BY product_id, week
+                    ON CONFLICT (product_id, week) DO UPDATE SET
+                        open_price = CASE WHEN excluded.open_ts < open_ts THEN excluded.open_price ELSE open_price END,
+                        open_ts = MIN(open_ts, excluded.open_ts),
+                        close_price = CASE WHEN excluded.close_ts >= close_ts THEN excluded.close_price ELSE close_price END,
+                        close_ts = MAX(close_ts, excluded.close_ts),
+                        min_price = MIN(min_price, excluded.min_price),
+                        max_price = MAX(max_price, excluded.max_price),
+                        samples = samples + excluded.samples,
+                        price_sum = price_sum + excluded.price_sum,
+                        price_sum_squares = price_sum_squares + excluded.price_sum_squares
+                ''')
+                conn.execute('''
+                    DELETE FROM price_daily
+                    WHERE (product_id, day) IN (SELECT product_id, day FROM retention_days)
+                ''')
+                conn.execute('DROP TABLE temp.retention_days')
+            
+            rolled_up += count
+            if count < batch_size:
+                return rolled_up
+            if pause:
+                time.sleep(pause)
+    
+    def archive_cold_prices(self, older_than):
+        """Move price_history rows older than ``older_than`` days into the archive
+        
+        Each product's rows are appended to its archive file first and only
+        then deleted, in one short transaction per product; rows already
+        archived by an interrupted run are skipped. Returns rows archived.
+        """
+        conn = self.get_connection()
+        cutoff = f'-{int(older_than)} days'
+        product_ids = [row[0] for row in conn.execute('''
+            SELECT DISTINCT product_id FROM price_history
+            WHERE timestamp < date('now', ?)
+        ''', (cutoff,))]
+        
+        archived = 0
+        for product_id in product_ids:
+            rows = conn.execute('''
+                SELECT CAST(strftime('%s', timestamp) AS INTEGER), CAST(ROUND(price * 100) AS INTEGER)
+                FROM price_history
+                WHERE product_id = ? AND timestamp < date('now', ?)
+                ORDER BY timestamp, id
+            ''', (product_id, cutoff)).fetchall()
+            archived_until = self.archive.append(product_id, rows)
+            
+            with conn:
+                cursor = conn.execute('''
+                    DELETE FROM price_history
+                    WHERE product_id = ? AND timestamp <= ?
+                ''', (product_id, format_timestamp(archived_until)))
+            archived += cursor.rowcount
+        
+        return archived
+    
+    def incremental_vacuum_enabled(self):
+        """Whether the database uses auto_vacuum=INCREMENTAL"""
+        return self.get_connection().execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    
+    def enable_incremental_vacuum(self):
+        """Switch an older database to auto_vacuum=INCREMENTAL; False if it already is
+        
+        A one-off maintenance step, never run by the scheduler: the switch
+        needs one full VACUUM, which rewrites the whole file under an
+        exclusive lock.
+        """
+        if self.incremental_vacuum_enabled():
+            return False
+        
+        conn = self.get_connection()
+        conn.commit()
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+        return True
+    
+    def incremental_vacuum(self, pages_per_step=1000, pause=0):
+        """Release free pages to the filesystem a step at a time; returns pages released"""
+        conn = self.get_connection()
+        released = 0
+        
+        while True:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free_pages:
+                break
+            # The pragma frees one page per result row, so every row must be fetched
+            conn.execute(f'PRAGMA incremental_vacuum({int(pages_per_step)})').fetchall()
+            conn.commit()
+            remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if remaining >= free_pages:
+                break
+            released += free_pages - remaining
+            if pause:
+                time.sleep(pause)
+        
+        # Truncate the WAL too, or the file on disk stays large until the next checkpoint
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        return released
 
 # Test database
 if __name__ == '__main__':
@@ -81,6 +81,34 @@ class EmailAlerts:
             logger.error(f"Failed to send email: {e}")
             return False
     
+    def notify_pending_alerts(self, db):
+        """Send emails for every triggered alert still waiting in the queue"""
+        sent = 0
+        
+        for alert in db.check_alerts():
+            alert_id, product_name, target_price, current_price, email, url = alert
+            
+            # Another worker may be draining the same queue
+            if not db.claim_alert_notification(alert_id):
+                continue
+            
+            if not email:
+                continue
+            
+            if self.send_price_alert(
+                recipient_email=email,
+                product_name=product_name,
+                current_price=current_price,
+                target_price=target_price,
+                product_url=url
+            ):
+                sent += 1
+                logger.info(f"Alert triggered for {product_name}: ₹{current_price}")
+            else:
+                db.release_alert_notification(alert_id)
+        
+        return sent
+    
     def send_weekly_summary(self, recipient_email, tracked_products):
         """Send weekly summary of tracked products"""
         try:
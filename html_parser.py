@@ -0,0 +1,75 @@
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    logger.warning("lxml is not installed, falling back to html.parser")
+
+# tag, .class and [attr="value"] parts of a simple CSS selector
+SIMPLE_SELECTOR = re.compile(r'^(?P<tag>[\w-]+)?(?P<classes>(?:\.[\w-]+)*)(?P<attrs>(?:\[[\w-]+="[^"]*"\])*)$')
+ATTRIBUTE = re.compile(r'\[([\w-]+)="([^"]*)"\]')
+
+def _classes(value):
+    if not value:
+        return set()
+    return set(value.split() if isinstance(value, str) else value)
+
+def strainer_for(selectors):
+    """Build a SoupStrainer keeping elements that match any of ``selectors``
+    
+    Supports selectors of the form ``tag.class[.class]`` or
+    ``tag[attr="value"]`` that all constrain the same attribute; anything
+    else returns None so the whole page is parsed.
+    """
+    tags = set()
+    keys = set()
+    class_sets = []
+    values = set()
+    
+    for selector in selectors:
+        parts = SIMPLE_SELECTOR.match(selector.strip())
+        if not parts:
+            keys.add(None)
+            break
+        tags.add(parts.group('tag'))
+        classes = set(parts.group('classes').split('.')[1:])
+        attrs = ATTRIBUTE.findall(parts.group('attrs'))
+        if classes and not attrs:
+            keys.add('class')
+            class_sets.append(classes)
+        elif len(attrs) == 1 and not classes:
+            keys.add(attrs[0][0])
+            values.add(attrs[0][1])
+        else:
+            keys.add(None)
+    
+    if len(keys) != 1 or None in keys:
+        logger.warning(f"Cannot build a strainer for {selectors}, parsing whole pages")
+        return None
+    
+    key = keys.pop()
+    names = None if None in tags else sorted(tags)
+    if key == 'class':
+        match = lambda value: any(wanted <= _classes(value) for wanted in class_sets)
+    else:
+        match = lambda value: value in values
+    
+    return SoupStrainer(names, attrs={key: match})
+
+def resolve_parser(parser):
+    """Return a usable BeautifulSoup backend name"""
+    if parser == 'lxml' and not LXML_AVAILABLE:
+        return 'html.parser'
+    return parser
+
+def make_soup(content, parser=None, parse_only=None):
+    """Parse a page with the given backend, optionally limited by a strainer"""
+    return BeautifulSoup(content, resolve_parser(parser or Config.HTML_PARSER), parse_only=parse_only)
@@ -0,0 +1,72 @@
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying with backoff
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+class SessionPool:
+    """Shared keep-alive HTTP sessions, one per platform host"""
+    
+    def __init__(self, pool_size=None, max_retries=None, backoff_factor=None):
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.max_retries = Config.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = Config.HTTP_RETRY_BACKOFF if backoff_factor is None else backoff_factor
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def _build_session(self):
+        """Create a session with pooled connections and retry/backoff"""
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=['GET', 'HEAD'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def get_session(self, url):
+        """Return the shared session for the host of ``url``"""
+        host = urlsplit(url).netloc
+        
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    logger.info(f"Opening HTTP session pool for {host}")
+                    session = self._build_session()
+                    self._sessions[host] = session
+        
+        return session
+    
+    def get(self, url, **kwargs):
+        """Issue a GET through the host's pooled session"""
+        return self.get_session(url).get(url, **kwargs)
+    
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+# Process-wide pool shared by all scrapers
+session_pool = SessionPool()
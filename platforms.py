@@ -0,0 +1,218 @@
+from datetime import datetime
+from urllib.parse import urljoin
+import soupsieve
+from config import Config
+from html_parser import make_soup, strainer_for
+
+def strip_currency(*symbols):
+    """Price normalizer removing currency symbols and thousands separators"""
+    def normalize(text):
+        for symbol in symbols:
+            text = text.replace(symbol, '')
+        return float(text.replace(',', '').strip())
+    return normalize
+
+def first_word(text):
+    """Rating transform for '4.3 out of 5 stars' style labels"""
+    return text.split()[0]
+
+class PlatformSpec:
+    """Declarative description of how to search and extract one platform
+    
+    Selectors are plain CSS, tried in order, and compiled once when the
+    platform is registered.
+    """
+    
+    FIELDS = ('title', 'price', 'link', 'rating', 'image')
+    
+    def __init__(self, name, search_url, query_separator, containers, fields,
+                 base_url='', price_normalizer=None, rating_transform=None,
+                 rate_limit=None, fragment_marker=None, parser=None, js_rendered=False):
+        self.name = name
+        self.search_url = search_url
+        self.query_separator = query_separator
+        self.containers = containers
+        self.fields = fields
+        self.base_url = base_url
+        self.price_normalizer = price_normalizer or strip_currency('₹', 'Rs.')
+        self.rating_transform = rating_transform or (lambda text: text.strip())
+        self.rate_limit = rate_limit or Config.DEFAULT_RATE_LIMIT
+        self.fragment_marker = fragment_marker
+        self.parser = parser
+        self.js_rendered = js_rendered
+        self.compile()
+    
+    def compile(self):
+        """Compile container and field selectors for reuse across requests"""
+        self.compiled_containers = [soupsieve.compile(selector) for selector in self.containers]
+        self.compiled_fields = {
+            field: [soupsieve.compile(selector) for selector in self.fields.get(field, [])]
+            for field in self.FIELDS
+        }
+        self.strainer = strainer_for(self.containers)
+        self.wait_selector = ', '.join(self.containers)
+    
+    def build_url(self, product_name):
+        return self.search_url.format(query=product_name.replace(' ', self.query_separator))
+    
+    def parse(self, content, strain=None):
+        """Parse a search page, limited to result containers unless disabled"""
+        strain = Config.HTML_STRAIN_RESULTS if strain is None else strain
+        parser = Config.PLATFORM_PARSERS.get(self.name, self.parser)
+        return make_soup(content, parser, self.strainer if strain else None)
+    
+    def _select(self, element, field):
+        for selector in self.compiled_fields[field]:
+            found = selector.select_one(element)
+            if found is not None:
+                return found
+        return None
+    
+    def find_card(self, soup):
+        """Return the first result card, trying container selectors in order"""
+        for selector in self.compiled_containers:
+            card = selector.select_one(soup)
+            if card is not None:
+                return card
+        return None
+    
+    def extract_card(self, card, search_url):
+        """Build a result dict from one result card, or None if it lacks a title or price"""
+        title_elem = self._select(card, 'title')
+        price_elem = self._select(card, 'price')
+        if not (title_elem and price_elem):
+            return None
+        
+        link_elem = self._select(card, 'link')
+        rating_elem = self._select(card, 'rating')
+        image_elem = self._select(card, 'image')
+        
+        return {
+            'platform': self.name,
+            'product_name': title_elem.text.strip()[:200],
+            'price': self.price_normalizer(price_elem.text),
+            'currency': 'INR',
+            'url': urljoin(self.base_url, link_elem['href']) if link_elem and link_elem.get('href') else search_url,
+            'rating': self.rating_transform(rating_elem.text) if rating_elem else 'N/A',
+            'image': image_elem.get('src', '') if image_elem else '',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def extract(self, soup, search_url):
+        """Extract the first result on a parsed search page"""
+        card = self.find_card(soup)
+        return self.extract_card(card, search_url) if card is not None else None
+    
+    def iter_cards(self, soup):
+        """Yield every result card, using the first container selector that matches
+        
+        Container selectors are alternatives, and some nest inside each
+        other, so only one of them is used per page.
+        """
+        for selector in self.compiled_containers:
+            cards = selector.iselect(soup)
+            first = next(cards, None)
+            if first is not None:
+                yield first
+                yield from cards
+                return
+    
+    def extract_all(self, soup, search_url, limit=None):
+        """Yield a result dict for every distinct listing on a parsed search page"""
+        limit = Config.MAX_RESULTS_PER_PAGE if limit is None else limit
+        seen = set()
+        
+        for card in self.iter_cards(soup):
+            if len(seen) >= limit:
+                return
+            try:
+                result = self.extract_card(card, search_url)
+            except (ValueError, KeyError):
+                # Cards without a parseable price (ads, "currently unavailable") are skipped
+                continue
+            if result and result['product_name'] not in seen:
+                seen.add(result['product_name'])
+                yield result
+
+PLATFORM_REGISTRY = {}
+
+def register_platform(spec):
+    """Add or replace a platform; scrapers and the scheduler pick it up by name"""
+    PLATFORM_REGISTRY[spec.name] = spec
+    return spec
+
+def get_platform(name):
+    return PLATFORM_REGISTRY.get(name)
+
+def platform_names():
+    return list(PLATFORM_REGISTRY)
+
+register_platform(PlatformSpec(
+    name='Amazon',
+    search_url='https://www.amazon.in/s?k={query}',
+    query_separator='+',
+    base_url='https://www.amazon.in',
+    containers=['div[data-component-type="s-search-result"]'],
+    fields={
+        'title': ['h2.a-size-mini', 'span.a-text-normal'],
+        'price': ['span.a-price-whole'],
+        'link': ['a.a-link-normal'],
+        'rating': ['span.a-icon-alt'],
+        'image': ['img.s-image'],
+    },
+    price_normalizer=strip_currency('₹'),
+    rating_transform=first_word,
+    rate_limit={'rate': 0.5, 'burst': 2},
+    fragment_marker=b's-search-result'
+))
+
+register_platform(PlatformSpec(
+    name='Flipkart',
+    search_url='https://www.flipkart.com/search?q={query}',
+    query_separator='%20',
+    base_url='https://www.flipkart.com',
+    containers=['div._1AtVbE', 'div._2kHMtA', 'div._13oc-S'],
+    fields={
+        'title': ['div._4rR01T', 'a.s1Q9rs'],
+        'price': ['div._30jeq3', 'div._25b18c'],
+        'link': ['a._1fQZEK', 'a'],
+        'rating': ['div._3LWZlK'],
+    },
+    price_normalizer=strip_currency('₹'),
+    rate_limit={'rate': 0.5, 'burst': 2},
+    fragment_marker=b'_1AtVbE'
+))
+
+register_platform(PlatformSpec(
+    name='Myntra',
+    search_url='https://www.myntra.com/{query}',
+    query_separator='-',
+    base_url='https://www.myntra.com',
+    # Myntra uses dynamic loading, static pages often have no cards
+    js_rendered=True,
+    containers=['li.product-base'],
+    fields={
+        'title': ['h4.product-product'],
+        'price': ['span.product-discountedPrice'],
+        'link': ['a'],
+    },
+    price_normalizer=strip_currency('Rs.'),
+    rate_limit={'rate': 0.5, 'burst': 2},
+    fragment_marker=b'product-base'
+))
+
+register_platform(PlatformSpec(
+    name='Snapdeal',
+    search_url='https://www.snapdeal.com/search?keyword={query}',
+    query_separator='%20',
+    base_url='https://www.snapdeal.com',
+    containers=['div.product-tuple-listing'],
+    fields={
+        'title': ['p.product-title'],
+        'price': ['span.lfloat.product-price'],
+        'link': ['a.dp-widget-link'],
+    },
+    price_normalizer=strip_currency('Rs.'),
+    rate_limit={'rate': 0.5, 'burst': 2},
+    fragment_marker=b'product-tuple-listing'
+))
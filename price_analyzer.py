@@ -1,27 +1,105 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from database import Database
+import math
 import statistics
 
-class PriceAnalyzer:
-    """Analyze price trends and generate insights"""
+# Window behind buy recommendations and savings, whatever window the trend uses
+RECOMMENDATION_DAYS = 90
+
+# Columns of Database.get_daily_aggregates rows
+DAILY_COLUMNS = ['product_id', 'day', 'open_price', 'close_price', 'min_price', 'max_price',
+                 'samples', 'price_sum', 'price_sum_squares']
+
+def summarize_daily(rows):
+    """Combine daily aggregate rows (oldest first) into statistics for their whole window"""
+    samples = sum(row[6] for row in rows)
+    if not samples:
+        return {'samples': 0}
     
-    def __init__(self):
-        self.db = Database()
+    total = math.fsum(row[7] for row in rows)
+    squares = math.fsum(row[8] for row in rows)
+    # Sample variance, same as statistics.stdev over the raw prices
+    variance = (squares - total * total / samples) / (samples - 1) if samples > 1 else 0
     
-    def get_price_trend(self, product_id, days=30):
+    return {
+        'samples': samples,
+        'first_price': rows[0][2],
+        'current_price': rows[-1][3],
+        'lowest_price': min(row[4] for row in rows),
+        'highest_price': max(row[5] for row in rows),
+        'average_price': total / samples,
+        'volatility': math.sqrt(max(variance, 0))
+    }
+
+class ProductAnalysis:
+    """Price analysis of one product from a single history load
+    
+    Daily aggregates (for trend, recommendation and savings) are fetched
+    once for at least RECOMMENDATION_DAYS; raw history (for the chart) is
+    fetched only for the ``days`` actually requested, since it is the
+    costly read. Every metric is computed on first use and memoized, so a
+    request can ask for several without repeating a query. Windows are
+    whole days when read from the aggregates.
+    """
+    
+    def __init__(self, db, product_id, days=30):
+        self.db = db
+        self.product_id = product_id
+        self.days = days
+        self.daily_days = max(days, RECOMMENDATION_DAYS)
+        self._history = None
+        self._history_days = None
+        self._daily = None
+        self._memo = {}
+    
+    def _memoize(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+    
+    def history(self, days=None):
+        """Price history within ``days`` (default: the requested window), newest first"""
+        days = self.days if days is None else days
+        if self._history is None or days > self._history_days:
+            self._history = self.db.get_price_history(self.product_id, days)
+            self._history_days = days
+        if days == self._history_days:
+            return self._history
+        
+        # Same cutoff as the database's datetime('now', '-N days'), in UTC
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        return self._memoize(('history', days), lambda: [h for h in self._history if h['timestamp'] >= cutoff])
+    
+    def daily(self, days=None):
+        """Daily aggregate rows within ``days`` (default: the whole loaded window), oldest first"""
+        if self._daily is None:
+            self._daily = self.db.get_daily_aggregates([self.product_id], self.daily_days)
+        if days is None or days >= self.daily_days:
+            return self._daily
+        
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+        return [row for row in self._daily if row[1] >= cutoff]
+    
+    def stats(self, days=90):
+        """Sample count, first/current price, min, max, mean and stdev over ``days``"""
+        return self._memoize(('stats', days), lambda: summarize_daily(self.daily(days)))
+    
+    def trend(self, days=30):
         """Analyze price trend over time"""
-        history = self.db.get_price_history(product_id, days)
+        return self._memoize(('trend', days), lambda: self._trend(days))
+    
+    def _trend(self, days):
+        stats = self.stats(days)
         
-        if len(history) < 2:
+        if stats['samples'] < 2:
             return {'trend': 'insufficient_data'}
         
-        prices = [h['price'] for h in history]
-        
         # Calculate trend
-        first_price = prices[-1]
-        last_price = prices[0]
+        first_price = stats['first_price']
+        last_price = stats['current_price']
         change_percent = ((last_price - first_price) / first_price) * 100
         
         # Determine trend direction
@@ -35,27 +113,30 @@ class PriceAnalyzer:
         return {
             'trend': trend,
             'change_percent': round(change_percent, 2),
-            'lowest_price': min(prices),
-            'highest_price': max(prices),
-            'average_price': round(statistics.mean(prices), 2),
+            'lowest_price': stats['lowest_price'],
+            'highest_price': stats['highest_price'],
+            'average_price': round(stats['average_price'], 2),
             'current_price': last_price,
-            'volatility': round(statistics.stdev(prices), 2) if len(prices) > 1 else 0
+            'volatility': round(stats['volatility'], 2)
         }
     
-    def predict_best_time_to_buy(self, product_id):
+    def recommendation(self):
         """Predict best time to buy based on historical data"""
-        history = self.db.get_price_history(product_id, days=90)
+        return self._memoize('recommendation', self._recommendation)
+    
+    def _recommendation(self):
+        stats = self.stats(RECOMMENDATION_DAYS)
         
-        if len(history) < 7:
+        if stats['samples'] < 7:
             return {'recommendation': 'Need more data'}
         
-        prices = [h['price'] for h in history]
-        current_price = prices[0]
-        avg_price = statistics.mean(prices)
-        min_price = min(prices)
+        current_price = stats['current_price']
+        avg_price = stats['average_price']
+        min_price = stats['lowest_price']
         
         # Calculate price position
-        price_position = (current_price - min_price) / (max(prices) - min_price) * 100
+        price_range = stats['highest_price'] - min_price
+        price_position = (current_price - min_price) / price_range * 100 if price_range else 0
         
         if current_price <= min_price * 1.05:
             recommendation = 'buy_now'
@@ -77,42 +158,15 @@ class PriceAnalyzer:
             'average_price': round(avg_price, 2),
             'lowest_price': min_price,
             'price_position': round(price_position, 2),
-            'confidence': 'high' if len(history) > 30 else 'medium'
-        }
-    
-    def compare_platforms(self, product_name):
-        """Compare prices across platforms for same product"""
-        results = self.db.get_latest_prices_by_product(product_name)
-        
-        if not results:
-            return {'error': 'No data found'}
-        
-        comparison = []
-        for result in results:
-            comparison.append({
-                'platform': result['platform'],
-                'price': result['price'],
-                'url': result['url'],
-                'last_updated': result['timestamp']
-            })
-        
-        # Find best deal
-        best_deal = min(comparison, key=lambda x: x['price'])
-        worst_deal = max(comparison, key=lambda x: x['price'])
-        
-        savings = worst_deal['price'] - best_deal['price']
-        savings_percent = (savings / worst_deal['price']) * 100
-        
-        return {
-            'comparison': comparison,
-            'best_deal': best_deal,
-            'potential_savings': round(savings, 2),
-            'savings_percent': round(savings_percent, 2)
+            'confidence': 'high' if stats['samples'] > 30 else 'medium'
         }
     
-    def generate_price_chart(self, product_id, days=30):
+    def chart(self, days=30):
         """Generate interactive price chart"""
-        history = self.db.get_price_history(product_id, days)
+        return self._memoize(('chart', days), lambda: self._chart(days))
+    
+    def _chart(self, days):
+        history = self.history(days)
         
         if not history:
             return None
@@ -155,6 +209,81 @@ class PriceAnalyzer:
         
         return fig.to_html(full_html=False)
     
+    def savings(self):
+        """Calculate potential savings over time"""
+        return self._memoize('savings', self._savings)
+    
+    def _savings(self):
+        stats = self.stats(RECOMMENDATION_DAYS)
+        
+        if stats['samples'] < 2:
+            return {'savings': 0}
+        
+        current_price = stats['current_price']
+        max_price = stats['highest_price']
+        
+        savings = max_price - current_price
+        savings_percent = (savings / max_price) * 100
+        
+        return {
+            'current_price': current_price,
+            'highest_price': max_price,
+            'savings': round(savings, 2),
+            'savings_percent': round(savings_percent, 2)
+        }
+
+class PriceAnalyzer:
+    """Analyze price trends and generate insights"""
+    
+    def __init__(self, db=None):
+        self.db = db or Database()
+    
+    def analyze(self, product_id, days=30):
+        """ProductAnalysis of a product, with raw history loaded for ``days``"""
+        return ProductAnalysis(self.db, product_id, days)
+    
+    def get_price_trend(self, product_id, days=30):
+        """Analyze price trend over time"""
+        return self.analyze(product_id, days).trend(days)
+    
+    def predict_best_time_to_buy(self, product_id):
+        """Predict best time to buy based on historical data"""
+        return self.analyze(product_id).recommendation()
+    
+    def compare_platforms(self, product_name):
+        """Compare prices across platforms for same product"""
+        results = self.db.get_latest_prices_by_product(product_name)
+        
+        if not results:
+            return {'error': 'No data found'}
+        
+        comparison = []
+        for result in results:
+            comparison.append({
+                'platform': result['platform'],
+                'price': result['price'],
+                'url': result['url'],
+                'last_updated': result['timestamp']
+            })
+        
+        # Find best deal
+        best_deal = min(comparison, key=lambda x: x['price'])
+        worst_deal = max(comparison, key=lambda x: x['price'])
+        
+        savings = worst_deal['price'] - best_deal['price']
+        savings_percent = (savings / worst_deal['price']) * 100
+        
+        return {
+            'comparison': comparison,
+            'best_deal': best_deal,
+            'potential_savings': round(savings, 2),
+            'savings_percent': round(savings_percent, 2)
+        }
+    
+    def generate_price_chart(self, product_id, days=30):
+        """Generate interactive price chart"""
+        return self.analyze(product_id, days).chart(days)
+    
     def get_price_alerts_summary(self, user_email):
         """Get summary of user's price alerts"""
         alerts = self.db.get_user_alerts(user_email)
@@ -171,24 +300,100 @@ class PriceAnalyzer:
     
     def calculate_savings(self, product_id):
         """Calculate potential savings over time"""
-        history = self.db.get_price_history(product_id, days=90)
+        return self.analyze(product_id).savings()
+    
+    def load_daily(self, product_ids, days=90):
+        """Daily aggregates of many products as one frame, oldest day first per product"""
+        return pd.DataFrame(self.db.get_daily_aggregates(product_ids, days), columns=DAILY_COLUMNS)
+    
+    @staticmethod
+    def _window_stats(daily, product_ids):
+        """summarize_daily for every product in a frame of daily rows, vectorized"""
+        # Exact sums (math.fsum, as in summarize_daily) keep averages identical to the single-product path
+        stats = daily.groupby('product_id').agg(
+            samples=('samples', 'sum'),
+            first_price=('open_price', 'first'),
+            current_price=('close_price', 'last'),
+            lowest_price=('min_price', 'min'),
+            highest_price=('max_price', 'max'),
+            price_sum=('price_sum', math.fsum),
+            price_sum_squares=('price_sum_squares', math.fsum)
+        ).astype({'price_sum': float, 'price_sum_squares': float}).reindex(pd.Index(product_ids, name='product_id'))
+        samples = stats['samples'] = stats['samples'].fillna(0).astype(int)
         
-        if len(history) < 2:
-            return {'savings': 0}
+        stats['average_price'] = stats['price_sum'] / samples.where(samples > 0)
+        # Sample variance from the running sums, as in summarize_daily
+        variance = (stats['price_sum_squares'] - stats['price_sum'] ** 2 / samples) / (samples - 1)
+        stats['volatility'] = np.sqrt(variance.where(samples > 1).clip(lower=0)).fillna(0)
+        return stats
+    
+    def analyze_products(self, product_ids, days=30):
+        """Trend, volatility, price position and savings for many products at once
         
-        prices = [h['price'] for h in history]
-        current_price = prices[0]
-        max_price = max(prices)
+        Returns a frame indexed by product_id with the figures
+        get_price_trend (over ``days``), predict_best_time_to_buy and
+        calculate_savings (over RECOMMENDATION_DAYS) report for a single
+        product, from one load of daily aggregates. The RECOMMENDATION_DAYS
+        range behind price_position, recommendation and savings is returned
+        under its own ``recommendation_*`` columns, so it is never mistaken
+        for the ``days`` range. Products without history get zero samples.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        daily = self.load_daily(product_ids, max(days, RECOMMENDATION_DAYS))
         
-        savings = max_price - current_price
-        savings_percent = (savings / max_price) * 100
+        def window(window_days):
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=window_days)).strftime('%Y-%m-%d')
+            return self._window_stats(daily[daily['day'] >= cutoff], product_ids)
         
-        return {
-            'current_price': current_price,
-            'highest_price': max_price,
-            'savings': round(savings, 2),
-            'savings_percent': round(savings_percent, 2)
-        }
+        # Trend figures, as get_price_trend(days)
+        trend = window(days)
+        stats = trend[['samples', 'current_price', 'lowest_price', 'highest_price',
+                       'average_price', 'volatility']].copy()
+        samples = trend['samples']
+        stats['change_percent'] = (trend['current_price'] - trend['first_price']) / trend['first_price'] * 100
+        stats['trend'] = np.select(
+            [samples < 2, stats['change_percent'] > 5, stats['change_percent'] < -5],
+            ['insufficient_data', 'increasing', 'decreasing'],
+            default='stable'
+        )
+        
+        # Recommendation and savings, as predict_best_time_to_buy and calculate_savings
+        longer = window(RECOMMENDATION_DAYS)
+        samples = longer['samples']
+        current = longer['current_price']
+        lowest = longer['lowest_price']
+        highest = longer['highest_price']
+        average = longer['average_price']
+        stats['recommendation_samples'] = samples
+        stats['recommendation_lowest_price'] = lowest
+        stats['recommendation_highest_price'] = highest
+        stats['recommendation_average_price'] = average
+        
+        # A flat history sits at the bottom of its (empty) range
+        price_range = highest - lowest
+        position = ((current - lowest) / price_range.where(price_range > 0)).fillna(0) * 100
+        stats['price_position'] = position.where(samples >= 7)
+        stats['recommendation'] = np.select(
+            [samples < 7, current <= lowest * 1.05, current <= average * 0.95, current >= average * 1.1],
+            ['Need more data', 'buy_now', 'good_time', 'wait'],
+            default='neutral'
+        )
+        
+        enough = samples >= 2
+        stats['savings'] = (highest - current).where(enough, 0)
+        stats['savings_percent'] = ((highest - current) / highest * 100).where(enough, 0)
+        
+        rounded = ['average_price', 'volatility', 'change_percent', 'recommendation_average_price',
+                   'price_position', 'savings', 'savings_percent']
+        # Python's round, not numpy's, so halves land where the single-product figures do
+        stats[rounded] = stats[rounded].map(lambda value: round(float(value), 2))
+        return stats
+    
+    def summarize_products(self, product_ids, days=30):
+        """analyze_products as {product_id: metrics} with JSON-friendly values"""
+        stats = self.analyze_products(product_ids, days)
+        stats = stats.astype(object).where(stats.notna(), None)
+        return {int(product_id): row for product_id, row in stats.to_dict('index').items()}
 
 # Test analyzer
 if __name__ == '__main__':
@@ -0,0 +1,203 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from itertools import accumulate
+from config import Config
+
+# File: magic, format version, block count, newest archived timestamp
+FILE_HEADER = struct.Struct('<4sIIq4x')
+# Block: row count, first and last timestamp (epoch seconds)
+BLOCK_HEADER = struct.Struct('<Iqq4x')
+MAGIC = b'PRCA'
+VERSION = 1
+
+class PriceArchive:
+    """Compact per-product files of cold price history
+    
+    Each product's archived samples live in ``<directory>/<product_id>.prices``
+    as blocks of at most ``block_rows`` rows, oldest first. A block stores
+    its prices as int64 paise followed by uint32 timestamp deltas (seconds
+    since the previous sample, the first relative to the block header), so
+    a sample costs 12 bytes instead of a full SQLite row. Files are read
+    through mmap and blocks outside the requested window are skipped from
+    their headers alone. Appends add new blocks after the existing ones and
+    then update the file header in place, so their cost follows the new
+    rows, not the archive's size. Currency is not kept; every tracked
+    price is INR.
+    """
+    
+    def __init__(self, directory, block_rows=None):
+        self.directory = directory
+        self.block_rows = block_rows or Config.PRICE_ARCHIVE_BLOCK_ROWS
+        self._lock = threading.Lock()
+    
+    def path(self, product_id):
+        return os.path.join(self.directory, f'{int(product_id)}.prices')
+    
+    def last_timestamp(self, product_id):
+        """Newest archived timestamp (epoch seconds) for a product, or None"""
+        try:
+            with open(self.path(product_id), 'rb') as f:
+                header = f.read(FILE_HEADER.size)
+        except FileNotFoundError:
+            return None
+        _, _, blocks, last_ts = self._unpack_header(header)
+        return last_ts if blocks else None
+    
+    def read(self, product_id, since=None, limit=None):
+        """Archived ``(timestamp, price)`` pairs for a product, oldest first
+        
+        ``since`` drops samples older than that epoch second; ``limit``
+        keeps only the newest ``limit`` samples.
+        """
+        try:
+            f = open(self.path(product_id), 'rb')
+        except FileNotFoundError:
+            return []
+        
+        with f:
+            if os.fstat(f.fileno()).st_size <= FILE_HEADER.size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                _, _, blocks, _ = self._unpack_header(data[:FILE_HEADER.size])
+                
+                headers = [
+                    (offset, count, first_ts)
+                    for offset, count, first_ts, last_ts in self._block_headers(data, blocks)
+                    if since is None or last_ts >= since
+                ]
+                
+                # Newest blocks first, so a limit stops reading early
+                chunks = []
+                total = 0
+                for offset, count, first_ts in reversed(headers):
+                    block = self._decode(data, offset + BLOCK_HEADER.size, count, first_ts)
+                    if since is not None:
+                        block = [row for row in block if row[0] >= since]
+                    chunks.append(block)
+                    total += len(block)
+                    if limit is not None and total >= limit:
+                        break
+        
+        rows = [row for block in reversed(chunks) for row in block]
+        return rows[-limit:] if limit is not None else rows
+    
+    def append(self, product_id, rows):
+        """Archive ``(timestamp, paise)`` pairs newer than what is already stored
+        
+        ``rows`` must be sorted by timestamp. New blocks are written past
+        the last block the header counts and synced before the header is
+        rewritten in place, so readers only ever see whole blocks and a
+        crash in between leaves the archive as it was. A new file is built
+        at a temporary path and swapped in. Returns the newest archived
+        timestamp afterwards.
+        """
+        with self._lock:
+            path = self.path(product_id)
+            try:
+                f = open(path, 'r+b')
+            except FileNotFoundError:
+                return self._create(path, rows)
+            
+            with f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    _, _, blocks, last_ts = self._unpack_header(data[:FILE_HEADER.size])
+                    end = FILE_HEADER.size
+                    for offset, count, _, _ in self._block_headers(data, blocks):
+                        end = offset + self._block_size(count)
+                
+                new_rows = [row for row in rows if not blocks or row[0] > last_ts]
+                if not new_rows:
+                    return last_ts if blocks else None
+                
+                # Anything past ``end`` is left over from an interrupted append
+                f.seek(end)
+                starts = range(0, len(new_rows), self.block_rows)
+                for start in starts:
+                    f.write(self._encode(new_rows[start:start + self.block_rows]))
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+                
+                f.seek(0)
+                f.write(FILE_HEADER.pack(MAGIC, VERSION, blocks + len(starts), new_rows[-1][0]))
+                f.flush()
+                os.fsync(f.fileno())
+            return new_rows[-1][0]
+    
+    def _create(self, path, rows):
+        if not rows:
+            return None
+        
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            starts = range(0, len(rows), self.block_rows)
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, len(starts), rows[-1][0]))
+            for start in starts:
+                f.write(self._encode(rows[start:start + self.block_rows]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return rows[-1][0]
+    
+    @classmethod
+    def _block_headers(cls, data, blocks):
+        """``(offset, count, first_ts, last_ts)`` of each block, from the headers alone"""
+        offset = FILE_HEADER.size
+        for _ in range(blocks):
+            count, first_ts, last_ts = BLOCK_HEADER.unpack_from(data, offset)
+            yield offset, count, first_ts, last_ts
+            offset += cls._block_size(count)
+    
+    @staticmethod
+    def _unpack_header(header):
+        magic, version, blocks, last_ts = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} price archive")
+        return magic, version, blocks, last_ts
+    
+    @staticmethod
+    def _block_size(count):
+        # Prices (8 bytes) then deltas (4 bytes), padded so the next block stays 8-byte aligned
+        body = count * 12
+        return BLOCK_HEADER.size + body + (-body % 8)
+    
+    @staticmethod
+    def _encode(rows):
+        timestamps = [ts for ts, _ in rows]
+        prices = array('q', (paise for _, paise in rows))
+        deltas = array('I', [0] + [b - a for a, b in zip(timestamps, timestamps[1:])])
+        if sys.byteorder == 'big':
+            prices.byteswap()
+            deltas.byteswap()
+        
+        body = prices.tobytes() + deltas.tobytes()
+        header = BLOCK_HEADER.pack(len(rows), timestamps[0], timestamps[-1])
+        return header + body + b'\0' * (-len(body) % 8)
+    
+    @staticmethod
+    def _decode(data, offset, count, first_ts):
+        with memoryview(data)[offset:offset + count * 12] as view:
+            if sys.byteorder == 'little':
+                # Zero-copy views straight onto the mapped file
+                prices = view[:count * 8].cast('q')
+                deltas = view[count * 8:].cast('I')
+            else:
+                prices = array('q', view[:count * 8])
+                deltas = array('I', view[count * 8:])
+                prices.byteswap()
+                deltas.byteswap()
+            
+            # accumulate yields first_ts itself before adding the first (zero) delta
+            timestamps = accumulate(deltas, initial=first_ts)
+            next(timestamps)
+            rows = [(ts, paise / 100) for ts, paise in zip(timestamps, prices)]
+            
+            if isinstance(prices, memoryview):
+                prices.release()
+                deltas.release()
+        return rows
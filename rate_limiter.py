@@ -0,0 +1,64 @@
+import threading
+import time
+from config import Config
+from platforms import get_platform
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests/second with bursts up to ``capacity``"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+    
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self):
+        """Block until a token is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+class PlatformRateLimiter:
+    """Independent token buckets per platform so unrelated hosts never wait on each other"""
+    
+    def __init__(self, limits=None):
+        # Optional overrides; otherwise each platform's registered rate limit applies
+        self.limits = limits or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def get_bucket(self, platform):
+        """Return the bucket for a platform, creating it on first use"""
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(platform)
+                if bucket is None:
+                    spec = get_platform(platform)
+                    limit = self.limits.get(platform) or (spec.rate_limit if spec else Config.DEFAULT_RATE_LIMIT)
+                    bucket = TokenBucket(limit['rate'], limit['burst'])
+                    self._buckets[platform] = bucket
+        return bucket
+    
+    def acquire(self, platform):
+        """Block until the platform's rate allows another request"""
+        return self.get_bucket(platform).acquire()
+
+# Process-wide limiter shared by the web app and the scheduler
+rate_limiter = PlatformRateLimiter()
@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+from config import Config
+from platforms import get_platform
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def normalize_title(title):
+    """Lowercased title with runs of whitespace collapsed"""
+    return ' '.join((title or '').lower().split())
+
+def listing_url(url):
+    """Listing URL without query string or fragment, which carry tracking noise"""
+    parts = urlsplit(url or '')
+    return f'{parts.netloc}{parts.path}'.rstrip('/')
+
+def matches_product(result, product_name, product_url):
+    """Whether a search hit is the tracked listing rather than an ad, accessory or other variant"""
+    if normalize_title(result['product_name']) == normalize_title(product_name):
+        return True
+    
+    # Cards without a link fall back to the search page URL, which identifies no listing
+    spec = get_platform(result['platform'])
+    if not product_url or (spec and result['url'] == spec.build_url(product_name)):
+        return False
+    return listing_url(result['url']) == listing_url(product_url)
+
+class BatchWriter:
+    """Buffer scrape results from many workers and save them in bulk"""
+    
+    def __init__(self, db, batch_size):
+        self.db = db
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self._lock = threading.Lock()
+    
+    def add(self, result):
+        with self._lock:
+            self.pending.append(result)
+            if len(self.pending) < self.batch_size:
+                return
+            batch, self.pending = self.pending, []
+            self._write(batch)
+    
+    def flush(self):
+        with self._lock:
+            batch, self.pending = self.pending, []
+            self._write(batch)
+    
+    def _write(self, batch):
+        if batch:
+            self.db.save_prices_bulk(batch)
+            self.written += len(batch)
+
+class RefreshEngine:
+    """Refresh tracked products with one worker pool per platform
+    
+    A product ingested from a search page (it has a ``search_query``) is
+    refreshed by fetching that page again, once per query and platform for
+    every listing that came from it, so ingesting a whole page never costs
+    more requests than tracking its top listing.
+    """
+    
+    def __init__(self, db, scraper, workers_per_platform=None, batch_size=None):
+        self.db = db
+        self.scraper = scraper
+        self.workers_per_platform = workers_per_platform or Config.REFRESH_WORKERS_PER_PLATFORM
+        self.batch_size = batch_size or Config.PRICE_WRITE_BATCH_SIZE
+    
+    def refresh(self, products):
+        """Re-scrape ``(product_id, name, platform, url, search_query)`` tuples and return cycle stats
+        
+        A search hit only counts as a product's price when its title or
+        listing URL matches the tracked product; anything else is a failure.
+        Listings on a refreshed search page that no product matches yet are
+        ingested as new products of that page.
+        """
+        started = time.monotonic()
+        scrapers = self.scraper.get_platform_scrapers()
+        writer = BatchWriter(self.db, self.batch_size)
+        
+        # (query, search_query or None, [(name, url)]) jobs per platform; one request each
+        queues = defaultdict(list)
+        pages = defaultdict(list)
+        for product_id, product_name, platform, url, search_query in products:
+            if platform not in scrapers:
+                logger.warning(f"No scraper for platform {platform}, skipping {product_name}")
+            elif search_query:
+                pages[(platform, search_query)].append((product_name, url))
+            else:
+                queues[platform].append((product_name, None, [(product_name, url)]))
+        for (platform, search_query), tracked in pages.items():
+            queues[platform].append((search_query, search_query, tracked))
+        
+        counts = {platform: {'products': sum(len(job[2]) for job in queue), 'updated': 0, 'failed': 0}
+                  for platform, queue in queues.items()}
+        counts_lock = threading.Lock()
+        
+        def record(platform, job, result):
+            _, search_query, tracked = job
+            if search_query:
+                listings = list(result or [])
+            else:
+                listings = [result] if result else []
+            
+            updated = 0
+            for product_name, url in tracked:
+                match = next((r for r in listings if matches_product(r, product_name, url)), None)
+                if match is None:
+                    continue
+                listings.remove(match)
+                updated += 1
+                # Keep the tracked product's name and link, which the upsert would otherwise overwrite
+                writer.add(dict(match, product_name=product_name, url=url or match['url'],
+                                search_query=search_query))
+            if search_query:
+                for listing in listings:
+                    writer.add(dict(listing, search_query=search_query))
+            
+            with counts_lock:
+                counts[platform]['updated'] += updated
+                counts[platform]['failed'] += len(tracked) - updated
+        
+        if hasattr(self.scraper, 'scrape_many'):
+            self._refresh_async(queues, record, writer)
+        else:
+            page_scrapers = self.scraper.get_platform_scrapers(all_results=True)
+            self._refresh_threaded(queues, scrapers, page_scrapers, record, writer)
+        
+        duration = time.monotonic() - started
+        total = sum(c['products'] for c in counts.values())
+        stats = {
+            'products': total,
+            'updated': sum(c['updated'] for c in counts.values()),
+            'failed': sum(c['failed'] for c in counts.values()),
+            'requests': sum(len(queue) for queue in queues.values()),
+            'written': writer.written,
+            'duration': round(duration, 2),
+            'throughput': round(total / duration, 2) if duration > 0 else 0,
+            'platforms': counts
+        }
+        
+        logger.info(
+            f"Refresh cycle: {stats['updated']}/{total} updated from {stats['requests']} requests "
+            f"in {stats['duration']}s ({stats['throughput']} products/s)"
+        )
+        return stats
+    
+    def _refresh_threaded(self, queues, scrapers, page_scrapers, record, writer):
+        """Each platform drains its own queue; its rate limit lives in the scraper"""
+        def run(platform, job):
+            scrape = page_scrapers[platform] if job[1] else scrapers[platform]
+            record(platform, job, scrape(job[0]))
+        
+        executors = []
+        futures = []
+        for platform, queue in queues.items():
+            executor = ThreadPoolExecutor(
+                max_workers=self.workers_per_platform,
+                thread_name_prefix=f'refresh-{platform}'
+            )
+            executors.append(executor)
+            futures.extend(executor.submit(run, platform, job) for job in queue)
+        
+        try:
+            wait(futures)
+            for future in futures:
+                if future.exception():
+                    logger.error(f"Refresh worker failed: {future.exception()}")
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+            writer.flush()
+    
+    def _refresh_async(self, queues, record, writer):
+        """Put every product in flight at once; the async engine caps requests per host"""
+        jobs = [(platform, job) for platform, queue in queues.items() for job in queue]
+        products = [(platform, job) for platform, job in jobs if not job[1]]
+        pages = [(platform, job) for platform, job in jobs if job[1]]
+        try:
+            for items, all_results in ((products, False), (pages, True)):
+                if not items:
+                    continue
+                results = self.scraper.scrape_many([(platform, job[0]) for platform, job in items], all_results)
+                for (platform, job), result in zip(items, results):
+                    record(platform, job, result)
+        finally:
+            writer.flush()
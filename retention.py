@@ -0,0 +1,89 @@
+import time
+from config import Config
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RetentionEngine:
+    """Downsample aging price history in tiers and give the space back
+    
+    Prices younger than RETENTION_RAW_DAYS keep every observation. Older
+    ones are thinned to the lowest and last price per hour, then per day
+    after RETENTION_HOURLY_DAYS and per week after RETENTION_DAILY_DAYS;
+    daily aggregates past that age are rolled into weekly ones. Samples
+    older than PRICE_ARCHIVE_AFTER_DAYS then move to the columnar archive.
+    Deletes run in bounded batches and freed pages are released with
+    incremental VACUUM. A database created before auto_vacuum=INCREMENTAL
+    must be converted once with ``python retention.py
+    --enable-incremental-vacuum``; until then freed pages are reused but
+    not returned to the filesystem.
+    """
+    
+    def __init__(self, db, batch_size=None, pause=None):
+        self.db = db
+        self.batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+        self.pause = Config.RETENTION_BATCH_PAUSE if pause is None else pause
+        # (bucket, older than, newer than) in days, coarsest tier first
+        self.tiers = [
+            ('week', Config.RETENTION_DAILY_DAYS, None),
+            ('day', Config.RETENTION_HOURLY_DAYS, Config.RETENTION_DAILY_DAYS),
+            ('hour', Config.RETENTION_RAW_DAYS, Config.RETENTION_HOURLY_DAYS)
+        ]
+    
+    def run(self):
+        """Apply every retention tier and return stats for the run"""
+        started = time.monotonic()
+        
+        downsampled = {}
+        for bucket, older_than, newer_than in self.tiers:
+            downsampled[bucket] = self.db.downsample_prices(
+                bucket, older_than, newer_than, self.batch_size, self.pause
+            )
+        
+        archived = 0
+        if Config.PRICE_ARCHIVE_AFTER_DAYS:
+            archived = self.db.archive_cold_prices(Config.PRICE_ARCHIVE_AFTER_DAYS)
+        
+        rolled_up = self.db.rollup_daily_aggregates(
+            Config.RETENTION_DAILY_DAYS, self.batch_size, self.pause
+        )
+        
+        pages = 0
+        if self.db.incremental_vacuum_enabled():
+            pages = self.db.incremental_vacuum(Config.RETENTION_VACUUM_PAGES, self.pause)
+        else:
+            # The conversion rewrites the whole file under an exclusive lock, so it is never automatic
+            logger.warning(
+                "Database is not in incremental auto-vacuum mode; freed pages stay in the file. "
+                "Run `python retention.py --enable-incremental-vacuum` once during maintenance."
+            )
+        
+        stats = {
+            'deleted': sum(downsampled.values()),
+            'downsampled': downsampled,
+            'archived': archived,
+            'daily_rows_rolled_up': rolled_up,
+            'pages_released': pages,
+            'duration': round(time.monotonic() - started, 2)
+        }
+        
+        logger.info(
+            f"Retention: deleted {stats['deleted']} price rows, archived {archived}, "
+            f"rolled up {rolled_up} daily rows, released {pages} pages in {stats['duration']}s"
+        )
+        return stats
+
+if __name__ == '__main__':
+    # One-off conversion of an older database: python retention.py --enable-incremental-vacuum
+    import sys
+    from database import Database
+    
+    db = Database()
+    if '--enable-incremental-vacuum' in sys.argv[1:]:
+        if db.enable_incremental_vacuum():
+            print("Converted the database to incremental auto-vacuum")
+        else:
+            print("Database already uses incremental auto-vacuum")
+    else:
+        print(RetentionEngine(db).run())
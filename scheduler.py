@@ -1,8 +1,13 @@
 import schedule
+import threading
 import time
 from database import Database
-from advanced_scraper import AdvancedScraper
+from async_scraper import create_scraper
 from email_alerts import EmailAlerts
+from price_analyzer import PriceAnalyzer
+from refresh_engine import RefreshEngine
+from retention import RetentionEngine
+from adaptive_scheduler import AdaptiveRefreshQueue
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,32 +18,35 @@ class PriceScheduler:
     
     def __init__(self):
         self.db = Database()
-        self.scraper = AdvancedScraper()
+        self.scraper = create_scraper()
         self.email_alerts = EmailAlerts()
+        self.analyzer = PriceAnalyzer(self.db)
+        self.refresh_engine = RefreshEngine(self.db, self.scraper)
+        self.refresh_queue = AdaptiveRefreshQueue(self.db)
+        self.retention = RetentionEngine(self.db)
+        
+        # Notify as soon as a refreshed price triggers an alert, but never send
+        # email from inside a write: a background sender drains the queue
+        self._alerts_pending = threading.Event()
+        self.db.on_alerts_triggered = self._alerts_pending.set
+        threading.Thread(target=self._send_alerts_forever, name='alert-sender', daemon=True).start()
+    
+    def _send_alerts_forever(self):
+        while True:
+            self._alerts_pending.wait()
+            self._alerts_pending.clear()
+            self.check_price_alerts()
     
     def check_price_alerts(self):
-        """Check all active alerts and send notifications"""
+        """Retry notifications for triggered alerts that have not been sent yet
+        
+        Alerts are evaluated when prices are written, so this only drains
+        the pending notification queue.
+        """
         logger.info("Checking price alerts...")
         
         try:
-            triggered_alerts = self.db.check_alerts()
-            
-            for alert in triggered_alerts:
-                alert_id, product_name, target_price, current_price, email, url = alert
-                
-                # Send email notification
-                self.email_alerts.send_price_alert(
-                    recipient_email=email,
-                    product_name=product_name,
-                    current_price=current_price,
-                    target_price=target_price,
-                    product_url=url
-                )
-                
-                # Mark alert as triggered
-                self.db.deactivate_alert(alert_id)
-                
-                logger.info(f"Alert triggered for {product_name}: ₹{current_price}")
+            self.email_alerts.notify_pending_alerts(self.db)
         
         except Exception as e:
             logger.error(f"Error checking alerts: {e}")
@@ -49,40 +57,54 @@ class PriceScheduler:
         
         try:
             tracked_products = self.db.get_all_tracked_products()
-            
-            for product in tracked_products:
-                product_id, product_name, platform = product
-                
-                # Scrape latest price
-                if platform == 'Amazon':
-                    result = self.scraper.scrape_amazon(product_name)
-                elif platform == 'Flipkart':
-                    result = self.scraper.scrape_flipkart(product_name)
-                elif platform == 'Myntra':
-                    result = self.scraper.scrape_myntra(product_name)
-                elif platform == 'Snapdeal':
-                    result = self.scraper.scrape_snapdeal(product_name)
-                else:
-                    continue
-                
-                if result:
-                    self.db.save_price(result)
-                    logger.info(f"Updated {product_name} on {platform}: ₹{result['price']}")
-                
-                time.sleep(2)  # Rate limiting
+            return self.refresh_engine.refresh(tracked_products)
         
         except Exception as e:
             logger.error(f"Error updating products: {e}")
     
+    def refresh_due_products(self):
+        """Refresh products whose adaptive interval has elapsed"""
+        try:
+            due_products = self.refresh_queue.pop_due()
+            if not due_products:
+                return
+            
+            logger.info(f"Refreshing {len(due_products)} due products...")
+            stats = self.refresh_engine.refresh(due_products)
+            self.refresh_queue.reschedule([product[0] for product in due_products])
+            return stats
+        
+        except Exception as e:
+            logger.error(f"Error refreshing due products: {e}")
+    
+    def reload_refresh_queue(self):
+        """Pick up newly tracked products and alert changes"""
+        try:
+            self.refresh_queue.reload()
+        
+        except Exception as e:
+            logger.error(f"Error reloading refresh queue: {e}")
+    
     def send_weekly_summaries(self):
         """Send weekly price summaries to users"""
         logger.info("Sending weekly summaries...")
         
         try:
-            users = self.db.get_all_users_with_alerts()
+            users = {
+                user_email: self.db.get_user_tracked_products(user_email)
+                for user_email in self.db.get_all_users_with_alerts()
+            }
+            
+            # One history query and grouped pass for every user's products
+            product_ids = {product['id'] for products in users.values() for product in products}
+            stats = self.analyzer.summarize_products(product_ids, days=7)
             
-            for user_email in users:
-                tracked_products = self.db.get_user_tracked_products(user_email)
+            for user_email, products in users.items():
+                tracked_products = [
+                    dict(product, **stats[product['id']])
+                    for product in products
+                    if stats[product['id']]['samples']
+                ]
                 
                 if tracked_products:
                     self.email_alerts.send_weekly_summary(
@@ -95,12 +117,11 @@ class PriceScheduler:
             logger.error(f"Error sending summaries: {e}")
     
     def cleanup_old_data(self):
-        """Clean up old price history data"""
+        """Downsample aging price history and release the freed space"""
         logger.info("Cleaning up old data...")
         
         try:
-            deleted_count = self.db.cleanup_old_prices(days=90)
-            logger.info(f"Deleted {deleted_count} old price records")
+            return self.retention.run()
         
         except Exception as e:
             logger.error(f"Error cleaning up data: {e}")
@@ -111,9 +132,13 @@ class PriceScheduler:
         
         # Schedule tasks
         schedule.every(1).hours.do(self.check_price_alerts)
-        schedule.every(6).hours.do(self.update_tracked_products)
+        # Products are refreshed on their own volatility-based cadence
+        self.reload_refresh_queue()
+        schedule.every(1).minutes.do(self.refresh_due_products)
+        schedule.every(1).hours.do(self.reload_refresh_queue)
         schedule.every().monday.at("09:00").do(self.send_weekly_summaries)
-        schedule.every().sunday.at("02:00").do(self.cleanup_old_data)
+        # Daily runs keep each retention pass (and its delete batches) small
+        schedule.every().day.at("02:00").do(self.cleanup_old_data)
         
         logger.info("Scheduler started successfully!")
         
@@ -1,7 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
-import time
 from datetime import datetime
+from http_pool import session_pool
+from platforms import get_platform
 
 class PriceScraper:
     """Web scraper for e-commerce platforms"""
@@ -10,6 +9,7 @@ class PriceScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.http = session_pool
     
     def search_product(self, product_name):
         """Search product across multiple platforms"""
@@ -33,8 +33,8 @@ class PriceScraper:
             # Format search URL
             search_url = f"https://www.amazon.in/s?k={product_name.replace(' ', '+')}"
             
-            response = requests.get(search_url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.http.get(search_url, headers=self.headers, timeout=10)
+            soup = get_platform('Amazon').parse(response.content)
             
             # Find first product
             product = soup.find('div', {'data-component-type': 's-search-result'})
@@ -66,8 +66,8 @@ class PriceScraper:
             # Format search URL
             search_url = f"https://www.flipkart.com/search?q={product_name.replace(' ', '%20')}"
             
-            response = requests.get(search_url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.http.get(search_url, headers=self.headers, timeout=10)
+            soup = get_platform('Flipkart').parse(response.content)
             
             # Find first product
             product = soup.find('div', {'class': '_1AtVbE'})
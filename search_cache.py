@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+class _InFlight:
+    """A scrape currently running for a cache key"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.results = None
+        self.error = None
+
+class SearchCache:
+    """TTL + LRU cache of search results with single-flight loading"""
+    
+    def __init__(self, ttl=None, max_bytes=None):
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = Config.SEARCH_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, results)
+        self._in_flight = {}
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(query, platforms=None):
+        """Normalize the query and platform set into a cache key"""
+        normalized = ' '.join(query.lower().split())
+        platform_set = tuple(sorted(platforms)) if platforms else tuple(sorted(Config.PLATFORMS))
+        return normalized, platform_set
+    
+    def get(self, query, platforms=None):
+        """Return cached results or None"""
+        key = self.make_key(query, platforms)
+        with self._lock:
+            return self._get_locked(key)
+    
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, results = entry
+        if expires_at < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return list(results)
+    
+    def _evict(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+    
+    def set(self, query, platforms, results):
+        """Store results for a query"""
+        key = self.make_key(query, platforms)
+        with self._lock:
+            self._set_locked(key, results)
+    
+    def _set_locked(self, key, results):
+        size = len(json.dumps(results, default=str))
+        if size > self.max_bytes:
+            return
+        
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, list(results))
+        self._size += size
+        
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+    
+    def get_or_load(self, query, platforms, loader):
+        """Return cached results, or run ``loader`` once for all concurrent callers
+        
+        Returns a ``(results, cached)`` tuple; ``cached`` is False only for the
+        caller whose loader actually ran.
+        """
+        key = self.make_key(query, platforms)
+        results, flight = self._join_or_lead(key)
+        if flight is None:
+            return results, True
+        
+        try:
+            flight.results = loader()
+            self._store(key, flight.results)
+            return list(flight.results), False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+    
+    def stream_or_load(self, query, platforms, loader):
+        """Generator version of get_or_load for a generator ``loader``
+        
+        The leading caller re-yields the loader's items as they arrive; the
+        loader's return value is cached only if it runs to completion, so a
+        stream abandoned part-way never pins partial results. Returns a
+        ``(results, cached)`` tuple like get_or_load; cached and waiting
+        callers get nothing yielded.
+        """
+        key = self.make_key(query, platforms)
+        results, flight = self._join_or_lead(key)
+        if flight is None:
+            return results, True
+        
+        try:
+            flight.results = yield from loader()
+            self._store(key, flight.results)
+            return list(flight.results), False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+    
+    def _join_or_lead(self, key):
+        """Find results for ``key`` or start loading them
+        
+        Returns ``(results, None)`` from the cache or a finished flight, or
+        ``(None, flight)`` when this caller leads a new load.
+        """
+        while True:
+            with self._lock:
+                results = self._get_locked(key)
+                if results is not None:
+                    return results, None
+                
+                flight = self._in_flight.get(key)
+                if flight is None:
+                    flight = _InFlight()
+                    self._in_flight[key] = flight
+                    return None, flight
+            
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.results is not None:
+                return list(flight.results), None
+            # The leader was abandoned before finishing; load again
+    
+    def _store(self, key, results):
+        # Empty results usually mean a transient block, don't pin them
+        if results:
+            with self._lock:
+                self._set_locked(key, results)
+    
+    def _land(self, key, flight):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        flight.event.set()
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+# Process-wide cache shared by the web app and the API
+search_cache = SearchCache()
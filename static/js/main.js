@@ -24,21 +24,30 @@ document.addEventListener('DOMContentLoaded', function() {
         resultsDiv.innerHTML = '';
         
         try {
-            const response = await fetch('/search', {
+            const response = await fetch('/search/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({ product_name: productName })
             });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                displayResults(data.results);
-            } else {
-                resultsDiv.innerHTML = '<p>No results found. Try a different search term.</p>';
+            if (!response.ok) {
+                throw new Error(`Search failed with status ${response.status}`);
             }
+            
+            const results = [];
+            await readEvents(response, event => {
+                if (event.type === 'result' && event.result) {
+                    // Render each platform as soon as it arrives
+                    results.push(event.result);
+                    appendCard(event.result);
+                    highlightBestPrice(results);
+                } else if (event.type === 'analysis') {
+                    showAnalysis(event.analysis);
+                } else if (event.type === 'empty') {
+                    resultsDiv.innerHTML = '<p>No results found. Try a different search term.</p>';
+                }
+            });
         } catch (error) {
             console.error('Error:', error);
             resultsDiv.innerHTML = '<p>Error fetching prices. Please try again.</p>';
@@ -47,39 +56,75 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    function displayResults(results) {
-        if (results.length === 0) {
-            resultsDiv.innerHTML = '<p>No products found. Try a different search.</p>';
-            return;
-        }
-        
-        resultsDiv.innerHTML = '';
+    async function readEvents(response, onEvent) {
+        // The stream is newline-delimited JSON; a chunk may end mid-line
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
         
-        results.forEach(product => {
-            const card = document.createElement('div');
-            card.className = 'product-card';
+        while (true) {
+            const { value, done } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
             
-            card.innerHTML = `
-                <div class="platform-badge">${product.platform}</div>
-                <div class="product-name">${product.product_name}</div>
-                <div class="price">₹${product.price.toLocaleString()}</div>
-                <a href="${product.url}" target="_blank" class="product-link">View Product</a>
-            `;
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
             
-            resultsDiv.appendChild(card);
-        });
+            if (done) {
+                if (buffer.trim()) {
+                    onEvent(JSON.parse(buffer));
+                }
+                return;
+            }
+        }
+    }
+    
+    function appendCard(product) {
+        const card = document.createElement('div');
+        card.className = 'product-card';
+        
+        card.innerHTML = `
+            <div class="platform-badge">${product.platform}</div>
+            <div class="product-name">${product.product_name}</div>
+            <div class="price">₹${product.price.toLocaleString()}</div>
+            <a href="${product.url}" target="_blank" class="product-link">View Product</a>
+        `;
+        
+        resultsDiv.appendChild(card);
+    }
+    
+    function showAnalysis(analysis) {
+        const summary = document.createElement('div');
+        summary.className = 'analysis-summary';
+        summary.innerHTML = `
+            <strong>Best deal:</strong> ₹${analysis.best_price.toLocaleString()} on ${analysis.best_platform}
+            &nbsp;·&nbsp; <strong>Save up to</strong> ₹${analysis.potential_savings.toLocaleString()}
+            across ${analysis.total_platforms} platforms
+        `;
         
-        // Find lowest price
+        resultsDiv.prepend(summary);
+    }
+    
+    function highlightBestPrice(results) {
         const lowestPrice = Math.min(...results.map(p => p.price));
         const cards = resultsDiv.querySelectorAll('.product-card');
         
         cards.forEach((card, index) => {
+            const badge = card.querySelector('.best-price-badge');
             if (results[index].price === lowestPrice) {
                 card.style.border = '3px solid #28a745';
-                const badge = document.createElement('div');
-                badge.style.cssText = 'background: #28a745; color: white; padding: 5px 10px; border-radius: 5px; margin-top: 10px; text-align: center;';
-                badge.textContent = '🏆 Best Price';
-                card.appendChild(badge);
+                if (!badge) {
+                    const newBadge = document.createElement('div');
+                    newBadge.className = 'best-price-badge';
+                    newBadge.style.cssText = 'background: #28a745; color: white; padding: 5px 10px; border-radius: 5px; margin-top: 10px; text-align: center;';
+                    newBadge.textContent = '🏆 Best Price';
+                    card.appendChild(newBadge);
+                }
+            } else {
+                card.style.border = '';
+                if (badge) {
+                    badge.remove();
+                }
             }
         });
     }
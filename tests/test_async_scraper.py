@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_scraper import AsyncScraper
+from circuit_breaker import HALF_OPEN, OPEN, BreakerRegistry
+from rate_limiter import PlatformRateLimiter
+
+def open_breaker(scraper, platform):
+    breaker = scraper.breakers.get(platform)
+    breaker.state = OPEN
+    breaker.opened_at = 0
+    return breaker
+
+def make_scraper(scrape):
+    scraper = AsyncScraper()
+    scraper.breakers = BreakerRegistry()
+    scraper.rate_limiter = PlatformRateLimiter()
+    scraper._scrape = scrape
+    return scraper
+
+def test_cancelled_probe_frees_half_open_circuit():
+    calls = []
+    
+    async def slow_scrape(spec, product_name, all_results):
+        calls.append(product_name)
+        await asyncio.sleep(10)
+    
+    scraper = make_scraper(slow_scrape)
+    breaker = open_breaker(scraper, 'Amazon')
+    
+    # The probe misses the deadline and is cancelled
+    assert asyncio.run(scraper.search_all_platforms('phone', ['Amazon'], deadline=0.05)) == []
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    breaker.release()
+    
+    async def quick_scrape(spec, product_name, all_results):
+        calls.append(product_name)
+        return {'platform': 'Amazon', 'title': product_name, 'price': 100.0, 'url': 'u'}
+    
+    scraper._scrape = quick_scrape
+    results = asyncio.run(scraper.search_all_platforms('phone', ['Amazon'], deadline=1))
+    assert [result['title'] for result in results] == ['phone']
+    assert breaker.state != HALF_OPEN
+    assert len(calls) == 2
+
+def test_probe_cancelled_on_rate_limit_wait_frees_half_open_circuit():
+    async def scrape(spec, product_name, all_results):
+        raise AssertionError("the cancelled probe must not scrape")
+    
+    scraper = make_scraper(scrape)
+    breaker = open_breaker(scraper, 'Amazon')
+    bucket = scraper.rate_limiter.get_bucket('Amazon')
+    bucket.reserve = lambda: 10.0
+    
+    asyncio.run(scraper.search_all_platforms('phone', ['Amazon'], deadline=0.05))
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()